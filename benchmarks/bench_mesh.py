@@ -0,0 +1,73 @@
+## Accuracy of the non-uniform meshes (DegradationModel(mesh=...)) against a fine uniform
+## reference (nz=401): Mw at the critical depth, OIT profile in the surface layer and surface [CO].
+## The meshes only pay off on the pipe cases (see DegradationModel.__init__): compare each
+## non-uniform row with the uniform rows of the same case, not with a fixed target.
+##
+## Usage (from the repository root):  python benchmarks/bench_mesh.py
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from degradation_model import DegradationModel
+
+# (label, simulation_mode, L (m), T (°C), DOC (ppm), duration (years), depth of the surface layer (m))
+CASES = [
+    ('Fig 4 pipe, 66.5 ppm, 99 d', 'pipe', 4.5e-3, 40.0, 66.5, 99 / 365.25, 0.5e-3),
+    ('pipe 20°C, 1 ppm, 15 yr', 'pipe', 4.5e-3, 20.0, 1.0, 15.0, 0.5e-3),
+    ('SUEZ film 40°C, 0.05 ppm, 9 mo', 'film', 0.4e-3, 40.0, 0.05, 0.75, 0.4e-3),
+]
+
+MESHES = [
+    {'nz': 100}, {'nz': 50}, {'nz': 40}, {'nz': 25},
+    {'nz': 40, 'mesh': 'surface'}, {'nz': 25, 'mesh': 'surface'}, {'nz': 15, 'mesh': 'surface'},
+    {'nz': 40, 'mesh': 'adapted'}, {'nz': 25, 'mesh': 'adapted'}, {'nz': 15, 'mesh': 'adapted'},
+]
+
+
+def run_case(simulation_mode, L, T_celsius, DOC_ppm, t_end_years, n_obs=12, **model_args):
+    times_years = np.linspace(0, t_end_years, n_obs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = DegradationModel(L=L, simulation_mode=simulation_mode, **model_args)
+        start = time.time()
+        sol, observed = model.simulate_at(T_celsius, DOC_ppm, times_years,
+                                          observables=('oit_profile', 'co_surface', 'mw_proxy'),
+                                          fallback=True, rtol=1e-6, atol=1e-10, jacobian='analytic')
+    return model, sol, observed, time.time() - start
+
+
+def run_benchmark():
+    rows = []
+    for label, mode, L, T, DOC, t_end, depth in CASES:
+        ref_model, _, ref, _ = run_case(mode, L, T, DOC, t_end, nz=401)
+        for mesh_args in MESHES:
+            mesh_args = dict(mesh_args)
+            if mesh_args.get('mesh') == 'adapted': # Mesh following the fronts of a coarse uniform pilot run
+                pilot, pilot_sol, _, t_pilot = run_case(mode, L, T, DOC, t_end, nz=15)
+                mesh_args['mesh'] = pilot.adapted_mesh(pilot_sol, nz=mesh_args.pop('nz'))
+                name = "adapted (pilot nz=15)"
+            else:
+                t_pilot = 0.0
+                name = mesh_args.get('mesh', 'uniform')
+            model, _, obs, wall = run_case(mode, L, T, DOC, t_end, **mesh_args)
+
+            # OIT on the nodes of the surface layer, excluding the boundary node (same value on every mesh)
+            inner = (model.z > 0) & (model.z <= depth)
+            ref_oit = np.stack([np.interp(model.z[inner], ref_model.z, ref['oit_profile'][:, k])
+                                for k in range(ref['oit_profile'].shape[1])], axis=1)
+            err_oit = np.max(np.abs(obs['oit_profile'][inner] - ref_oit)) / ref_model.ti0_oit
+            err_mw = np.max(np.abs(obs['mw_proxy'] - ref['mw_proxy']) / ref['mw_proxy'])
+            err_co = np.max(np.abs(obs['co_surface'] - ref['co_surface'])) / (np.max(np.abs(ref['co_surface'])) + 1e-300)
+            rows.append((label, name, model.nz, err_mw, err_oit, err_co, wall + t_pilot))
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'case':<32} {'mesh':<22} {'nz':>4} {'Mw(crit) err':>13} {'OIT layer err':>14} {'CO(0) err':>10} {'time (s)':>9}")
+    for label, name, nz, err_mw, err_oit, err_co, wall in run_benchmark():
+        print(f"{label:<32} {name:<22} {nz:>4} {err_mw:13.2e} {err_oit:14.2e} {err_co:10.2e} {wall:9.2f}")
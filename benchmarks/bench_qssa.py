@@ -0,0 +1,137 @@
+## Accuracy of the quasi-steady-state approximation of the fast radicals P and PO2 along full-model
+## solutions, on the Fig. 3 / Fig. 4 conditions of Paper [2] (40°C, 4.5 mm pipe, Sample A antioxidant,
+## ti0 = 165 min) and on multi-decade pipe runs. At every output time, the radicals solved at quasi-steady
+## state from the other species (qssa_radicals) are compared with the integrated ones (error relative to
+## the largest value over the wall). The model itself always integrates the radicals: with the analytic
+## Jacobian the full runs take well under a second, so a reduced model brings no useful speedup.
+##
+## Usage (from the repository root):  python benchmarks/bench_qssa.py
+
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from degradation_model import DegradationModel
+
+FAST_SPECIES = ['P', 'PO2']
+# Lower bound of the quasi-steady radical concentrations (mol/L), keeps the Newton iterations regular
+QSSA_FLOOR = 1e-30
+
+# (label, T (°C), DOC (ppm), duration (days), Sample A antioxidant)
+CASES = [
+    ('Fig 3a 99d 0ppm', 40, 0.0, 99, True),
+    ('Fig 3b 2d 5ppm', 40, 5.0, 2, True),
+    ('Fig 3c 10d 31.8ppm', 40, 31.8, 10, True),
+    ('Fig 3d 51d 66.8ppm', 40, 66.8, 51, True),
+    ('Fig 3e 99d 68.5ppm', 40, 68.5, 99, True),
+    ('Fig 4 99d 66.5ppm', 40, 66.5, 99, True),
+    ('pipe 20C 1ppm 15yr', 20, 1.0, 15 * 365.25, False),
+    ('pipe 20C 1ppm 50yr', 20, 1.0, 50 * 365.25, False),
+]
+
+
+def qssa_radicals(model, C, guess=None, tol=1e-10, max_iter=60):
+    """
+    Concentrations of P and PO2 whose net production vanishes at every node,
+    stoich[fast] @ reaction_rates(C) = 0, the other species being fixed.
+
+    With mass-action kinetics the net productions are quadratic in (P, PO2): their coefficients
+    are built once, then damped Newton iterations on log(concentration) are done with a 2x2
+    solve per node, vectorized over the nodes. Uses the rate constants of the model's last run.
+
+    Args:
+        model (DegradationModel): Model after simulate() (rate_k and stoich set).
+        C (numpy.ndarray): Concentrations (n_species, nz); the P and PO2 rows are ignored.
+        guess (numpy.ndarray or None): Starting values (2, nz), e.g. the previous solution.
+
+    Returns:
+        numpy.ndarray: Quasi-steady concentrations of P and PO2, shape (2, nz).
+    """
+    C = np.maximum(C, 0.0) # Solver states may be slightly negative
+    nz = C.shape[1]
+    fast_idx = [model.idx[name] for name in FAST_SPECIES]
+    S_fast = model.stoich[fast_idx]
+    # g(X) = const + lin @ X + sum of quad terms, X = (P, PO2)
+    const = np.zeros((2, nz))
+    lin = np.zeros((2, 2, nz))
+    quad = []
+    for j, name in enumerate(model.reactions):
+        reactants = [model.idx[species_name] for species_name in model.reactants[name]]
+        fast_reactants = [fast_idx.index(a) for a in reactants if a in fast_idx]
+        coef = model.rate_k[j]
+        for a in reactants:
+            if a not in fast_idx:
+                coef = coef * C[a]
+        if not fast_reactants:
+            const += S_fast[:, j, None] * coef
+        elif len(fast_reactants) == 1:
+            lin[:, fast_reactants[0]] += S_fast[:, j, None] * coef
+        else:
+            quad.append((S_fast[:, j, None] * coef, fast_reactants[0], fast_reactants[1]))
+
+    if guess is None or guess.shape != (2, nz) or not np.all(guess > 0):
+        # Initiation rate r0 balanced by P + O2 (-> PO2) and PO2 + PO2 termination
+        k = dict(zip(model.reactions, model.rate_k))
+        r0 = np.maximum(const, 0.0).sum(axis=0)
+        PO2 = np.sqrt(r0 / (2 * k['k60']))
+        P = np.minimum(r0 / (k['k2'] * C[model.idx['O2']] + 1e-300), np.sqrt(r0 / (2 * k['k4'])))
+        guess = np.array([P, PO2])
+    X = np.maximum(guess, QSSA_FLOOR)
+
+    for _ in range(max_iter):
+        g = const + np.einsum('abi,bi->ai', lin, X)
+        J = lin.copy()
+        for coef, b, c in quad:
+            g += coef * X[b] * X[c]
+            J[:, b] += coef * X[c]
+            J[:, c] += coef * X[b]
+        J *= X[None, :, :] # d g / d log X
+        det = J[0, 0] * J[1, 1] - J[0, 1] * J[1, 0]
+        du = np.array([J[0, 1] * g[1] - J[1, 1] * g[0], J[1, 0] * g[0] - J[0, 0] * g[1]]) / det
+        du = np.clip(np.where(np.isfinite(du), du, 0.0), -3.0, 3.0)
+        X = np.maximum(X * np.exp(du), QSSA_FLOOR)
+        if np.max(np.abs(du)) < tol:
+            break
+    return X
+
+
+def radical_errors(model, sol):
+    """Largest relative errors of the quasi-steady P and PO2 over the output times (t > 0)."""
+    C = sol.y.reshape((model.n_species, model.nz, len(sol.t)))
+    fast_idx = [model.idx[name] for name in FAST_SPECIES]
+    errors = np.zeros(len(FAST_SPECIES))
+    guess = None
+    for k in range(1, len(sol.t)):
+        guess = qssa_radicals(model, C[:, :, k], guess)
+        exact = C[fast_idx, :, k]
+        scale = np.max(np.abs(exact), axis=1) + 1e-300
+        errors = np.maximum(errors, np.max(np.abs(guess - exact), axis=1) / scale)
+    return errors
+
+
+def run_benchmark(nz=25):
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = DegradationModel(L=4.5e-3, nz=nz, simulation_mode='pipe')
+    model.ti0_oit = 165.0
+    ah0_sample_a = (0.001 * model.dens0 / 1178 * model.n_AH) / model.AH0_conc
+
+    rows = []
+    for label, T, DOC, days, sample_a in CASES:
+        AH0_mult = ah0_sample_a if sample_a else 1.0
+        with contextlib.redirect_stdout(io.StringIO()):
+            sol = model.simulate(T, DOC, days / 365.25, n_timepoints=20, AH0_mult=AH0_mult, fallback=True)
+        if not sol.success:
+            rows.append((label, np.nan, np.nan))
+            continue
+        rows.append((label, *radical_errors(model, sol)))
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'case':<20} {'P rel err':>10} {'PO2 rel err':>11}")
+    for label, err_P, err_PO2 in run_benchmark():
+        print(f"{label:<20} {err_P:10.2e} {err_PO2:11.2e}")
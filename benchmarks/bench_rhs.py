@@ -0,0 +1,174 @@
+## Benchmark of the right-hand side DegradationModel.system_equations:
+## whole-array kernel vs. the original per-node loop, for nz from 25 to 1000.
+##
+## Usage (from the repository root):  python benchmarks/bench_rhs.py
+
+import contextlib
+import io
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from degradation_model import DegradationModel
+
+
+def loop_system_equations(model, t, y):
+    """Original per-node implementation of DegradationModel.system_equations (reference)."""
+    nz = model.nz
+    n_species = model.n_species
+    dz = model.dz
+    idx = model.idx
+    k = model.k
+    D = model.D
+    beta = model.beta
+    gamma = model.gamma
+    n_AH = model.n_AH
+
+    C = y.reshape((n_species, nz))
+    dCdt = np.zeros_like(C)
+
+    O2   = C[idx['O2']]
+    DOC  = C[idx['DOC']]
+    AH   = C[idx['AH']]
+    P    = C[idx['P']]
+    PO2  = C[idx['PO2']]
+    POOH = C[idx['POOH']]
+    PH   = C[idx['PH']]
+    Q    = C[idx['Q']]
+
+    # --- Interior points ---
+    for i in range(1, nz - 1):
+        dCdt[idx['O2'], i] = D['O2'] * (O2[i+1] - 2*O2[i] + O2[i-1]) / (dz**2) \
+                            - k['k2'] * O2[i] * P[i] + k['k60'] * PO2[i]**2
+        dCdt[idx['DOC'], i] = D['DOC'] * (DOC[i+1] - 2*DOC[i] + DOC[i-1]) / (dz**2) \
+                            - k['k1d'] * DOC[i] * PH[i] \
+                            - k['k4d'] * P[i] * DOC[i] \
+                            - n_AH * k['k8d'] * DOC[i] * AH[i]
+        dCdt[idx['AH'], i] = D['AH'] * (AH[i+1] - 2*AH[i] + AH[i-1]) / (dz**2) \
+                            - n_AH * k['k8d'] * DOC[i] * AH[i] \
+                            - n_AH * k['k7'] * PO2[i] * AH[i]
+        dCdt[idx['P'], i] = k['k1d'] * DOC[i] * PH[i] + 2 * k['k1u'] * POOH[i] \
+                        + k['k1b'] * POOH[i]**2 - k['k2'] * O2[i] * P[i] \
+                        + k['k3'] * PH[i] * PO2[i] - 2 * k['k4'] * P[i]**2 \
+                        - k['k4d'] * P[i] * DOC[i] - k['k5'] * P[i] * PO2[i] \
+                        + 2 * k['k63'] * Q[i]
+        dCdt[idx['PO2'], i] = k['k1b'] * POOH[i]**2 + k['k2'] * O2[i] * P[i] \
+                            - k['k3'] * PH[i] * PO2[i] - k['k5'] * P[i] * PO2[i] \
+                            - 2 * k['k60'] * PO2[i]**2 - n_AH * k['k7'] * PO2[i] * AH[i]
+        dCdt[idx['POOH'], i] = -k['k1u'] * POOH[i] - 2 * k['k1b'] * POOH[i]**2 \
+                            + k['k3'] * PH[i] * PO2[i] \
+                            + (1 - gamma['y5']) * k['k5'] * P[i] * PO2[i]
+        dCdt[idx['Q'], i] = k['k60'] * PO2[i]**2 - (k['k61'] + k['k62'] + k['k63']) * Q[i]
+        dCdt[idx['PH'], i] = -k['k1d'] * DOC[i] * PH[i] \
+                            - (2 + gamma['y1s']) * k['k1u'] * POOH[i] \
+                            - (1 + gamma['y1s']) * k['k1b'] * POOH[i]**2 \
+                            - k['k3'] * PH[i] * PO2[i] \
+                            + 2 * gamma['y4'] * k['k4'] * P[i]**2 \
+                            + (3 * gamma['y5'] - 1) * k['k5'] * P[i] * PO2[i] \
+                            + 2 * k['k61'] * Q[i] - 2 * (1 + gamma['y1s']) * k['k63'] * Q[i]
+        dCdt[idx['CO'], i] = gamma['y1co'] * k['k1u'] * POOH[i] \
+                            + gamma['y1co'] * k['k1b'] * POOH[i]**2 \
+                            + k['k62'] * Q[i] + 2 * gamma['y1co'] * k['k63'] * Q[i]
+        dCdt[idx['PCl'], i] = k['k4d'] * P[i] * DOC[i]
+        dCdt[idx['S'], i] = gamma['y1s'] * k['k1u'] * POOH[i] \
+                            + gamma['y1s'] * k['k1b'] * POOH[i]**2 \
+                            + 2 * gamma['y1s'] * k['k63'] * Q[i]
+        dCdt[idx['X'], i] = gamma['y4'] * k['k4'] * P[i]**2 \
+                            + gamma['y5'] * k['k5'] * P[i] * PO2[i] + k['k61'] * Q[i]
+
+    # --- Boundary Conditions ---
+    # === z = 0 (Inner surface, always water interface) ===
+    dCdt[idx['O2'], 0] = 0 
+    dCdt[idx['DOC'], 0] = 0 
+    dCdt[idx['AH'], 0] = -beta['beta0'] * AH[0] \
+                         - n_AH * k['k8d'] * DOC[0] * AH[0] \
+                         - n_AH * k['k7'] * PO2[0] * AH[0]
+    # Immobile species at z=0 (Reaction only)
+    dCdt[idx['P'], 0] = k['k1d'] * DOC[0] * PH[0] + 2 * k['k1u'] * POOH[0] + k['k1b'] * POOH[0]**2 - k['k2'] * O2[0] * P[0] + k['k3'] * PH[0] * PO2[0] - 2 * k['k4'] * P[0]**2 - k['k4d'] * P[0] * DOC[0] - k['k5'] * P[0] * PO2[0] + 2 * k['k63'] * Q[0]
+    dCdt[idx['PO2'], 0] = k['k1b'] * POOH[0]**2 + k['k2'] * O2[0] * P[0] - k['k3'] * PH[0] * PO2[0] - k['k5'] * P[0] * PO2[0] - 2 * k['k60'] * PO2[0]**2 - n_AH * k['k7'] * PO2[0] * AH[0]
+    dCdt[idx['POOH'], 0] = - k['k1u'] * POOH[0] - 2 * k['k1b'] * POOH[0]**2 + k['k3'] * PH[0] * PO2[0] + (1 - gamma['y5']) * k['k5'] * P[0] * PO2[0]
+    dCdt[idx['Q'], 0] = k['k60'] * PO2[0]**2 - (k['k61'] + k['k62'] + k['k63']) * Q[0]
+    dCdt[idx['PH'], 0] = - k['k1d'] * DOC[0] * PH[0] - (2 + gamma['y1s']) * k['k1u'] * POOH[0] - (1 + gamma['y1s']) * k['k1b'] * POOH[0]**2 - k['k3'] * PH[0] * PO2[0] + 2 * gamma['y4'] * k['k4'] * P[0]**2 + (3 * gamma['y5'] - 1) * k['k5'] * P[0] * PO2[0] + 2 * k['k61'] * Q[0] - 2 * (1 + gamma['y1s']) * k['k63'] * Q[0]
+    dCdt[idx['CO'], 0] = gamma['y1co'] * k['k1u'] * POOH[0] + gamma['y1co'] * k['k1b'] * POOH[0]**2 + k['k62'] * Q[0] + 2 * gamma['y1co'] * k['k63'] * Q[0]
+    dCdt[idx['PCl'], 0] = k['k4d'] * P[0] * DOC[0]
+    dCdt[idx['S'], 0] = gamma['y1s'] * k['k1u'] * POOH[0] + gamma['y1s'] * k['k1b'] * POOH[0]**2 + 2 * gamma['y1s'] * k['k63'] * Q[0]
+    dCdt[idx['X'], 0] = gamma['y4'] * k['k4'] * P[0]**2 + gamma['y5'] * k['k5'] * P[0] * PO2[0] + k['k61'] * Q[0]
+
+    # === z = L (Outer surface) ===
+    dCdt[idx['O2'], -1] = 0 # Fixed C[O2,-1]
+
+    if model.simulation_mode == 'film':
+        dCdt[idx['DOC'], -1] = 0 # Dirichlet for DOC (value was set in C0)
+        # AH at z=L for film: extraction by water (beta['betaL'] was made equal to beta['beta0'] effectively)
+        dCdt[idx['AH'], -1] = -beta['betaL'] * AH[-1] \
+                              - n_AH * k['k8d'] * DOC[-1] * AH[-1] \
+                              - n_AH * k['k7'] * PO2[-1] * AH[-1]
+    elif model.simulation_mode == 'pipe':
+        # DOC at z=L for pipe: No flux (Neumann) + Reactions
+        dCdt[idx['DOC'], -1] = D['DOC'] * 2.0 * (DOC[-2] - DOC[-1]) / (dz**2) \
+                               - k['k1d'] * DOC[-1] * PH[-1] \
+                               - k['k4d'] * P[-1] * DOC[-1] \
+                               - n_AH * k['k8d'] * DOC[-1] * AH[-1]
+        # AH at z=L for pipe: Evaporation (using original betaL definition)
+        dCdt[idx['AH'], -1] = -beta['betaL'] * AH[-1] \
+                              - n_AH * k['k8d'] * DOC[-1] * AH[-1] \
+                              - n_AH * k['k7'] * PO2[-1] * AH[-1]
+
+    # Immobile species at z=L (Reaction only)
+    dCdt[idx['P'], -1] = k['k1d'] * DOC[-1] * PH[-1] + 2 * k['k1u'] * POOH[-1] + k['k1b'] * POOH[-1]**2 - k['k2'] * O2[-1] * P[-1] + k['k3'] * PH[-1] * PO2[-1] - 2 * k['k4'] * P[-1]**2 - k['k4d'] * P[-1] * DOC[-1] - k['k5'] * P[-1] * PO2[-1] + 2 * k['k63'] * Q[-1]
+    dCdt[idx['PO2'], -1] = k['k1b'] * POOH[-1]**2 + k['k2'] * O2[-1] * P[-1] - k['k3'] * PH[-1] * PO2[-1] - k['k5'] * P[-1] * PO2[-1] - 2 * k['k60'] * PO2[-1]**2 - n_AH * k['k7'] * PO2[-1] * AH[-1]
+    dCdt[idx['POOH'], -1] = -k['k1u'] * POOH[-1] - 2 * k['k1b'] * POOH[-1]**2 + k['k3'] * PH[-1] * PO2[-1] + (1 - gamma['y5']) * k['k5'] * P[-1] * PO2[-1]
+    dCdt[idx['Q'], -1] = k['k60'] * PO2[-1]**2 - (k['k61'] + k['k62'] + k['k63']) * Q[-1]
+    dCdt[idx['PH'], -1] = -k['k1d'] * DOC[-1] * PH[-1] - (2 + gamma['y1s']) * k['k1u'] * POOH[-1] - (1 + gamma['y1s']) * k['k1b'] * POOH[-1]**2 - k['k3'] * PH[-1] * PO2[-1] + 2 * gamma['y4'] * k['k4'] * P[-1]**2 + (3 * gamma['y5'] - 1) * k['k5'] * P[-1] * PO2[-1] + 2 * k['k61'] * Q[-1] - 2 * (1 + gamma['y1s']) * k['k63'] * Q[-1]
+    dCdt[idx['CO'], -1] = gamma['y1co'] * k['k1u'] * POOH[-1] + gamma['y1co'] * k['k1b'] * POOH[-1]**2 + k['k62'] * Q[-1] + 2 * gamma['y1co'] * k['k63'] * Q[-1]
+    dCdt[idx['PCl'], -1] = k['k4d'] * P[-1] * DOC[-1]
+    dCdt[idx['S'], -1] = gamma['y1s'] * k['k1u'] * POOH[-1] + gamma['y1s'] * k['k1b'] * POOH[-1]**2 + 2 * gamma['y1s'] * k['k63'] * Q[-1]
+    dCdt[idx['X'], -1] = gamma['y4'] * k['k4'] * P[-1]**2 + gamma['y5'] * k['k5'] * P[-1] * PO2[-1] + k['k61'] * Q[-1]
+
+    return dCdt.flatten()
+
+
+def make_state(model, seed=0):
+    """Representative (non-trivial) state vector: initial profiles plus small radical/product levels."""
+    rng = np.random.default_rng(seed)
+    C = np.zeros((model.n_species, model.nz))
+    idx = model.idx
+    C[idx['O2']] = model.O2_sat_conc
+    C[idx['DOC']] = 1e-4 * np.exp(-model.z / (0.1 * model.L))
+    C[idx['AH']] = model.AH0_conc * (0.5 + 0.5 * rng.random(model.nz))
+    C[idx['POOH']] = model.POOH0_conc * (1 + rng.random(model.nz))
+    C[idx['PH']] = model.PH0_conc
+    for name in ['P', 'PO2', 'Q', 'CO', 'PCl', 'S', 'X']:
+        C[idx[name]] = 1e-8 * rng.random(model.nz)
+    return C.ravel()
+
+
+def run_benchmark(nz_values=(25, 50, 100, 200, 500, 1000), T_celsius=40.0, repeat=5):
+    rows = []
+    for simulation_mode in ['pipe', 'film']:
+        for nz in nz_values:
+            with contextlib.redirect_stdout(io.StringIO()):
+                model = DegradationModel(L=4.5e-3, nz=nz, simulation_mode=simulation_mode)
+            model._update_params_for_temp(T_celsius + 273.15)
+            model._build_rate_arrays()
+            y = make_state(model)
+
+            ref = loop_system_equations(model, 0.0, y)
+            new = model.system_equations(0.0, y)
+            scale = np.abs(ref).reshape(model.n_species, nz).max(axis=1, keepdims=True) + 1e-300
+            max_rel_err = np.max(np.abs(new - ref).reshape(model.n_species, nz) / scale)
+
+            number = max(1, 2000 // nz)
+            t_loop = min(timeit.repeat(lambda: loop_system_equations(model, 0.0, y), number=number, repeat=repeat)) / number
+            t_vec = min(timeit.repeat(lambda: model.system_equations(0.0, y), number=number, repeat=repeat)) / number
+            rows.append((simulation_mode, nz, t_loop, t_vec, t_loop / t_vec, max_rel_err))
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'mode':>5} {'nz':>5} {'loop (us)':>11} {'vector (us)':>12} {'speedup':>8} {'max rel err':>12}")
+    for mode, nz, t_loop, t_vec, speedup, err in run_benchmark():
+        print(f"{mode:>5} {nz:>5} {t_loop*1e6:11.1f} {t_vec*1e6:12.1f} {speedup:8.1f} {err:12.2e}")
@@ -0,0 +1,222 @@
+## Reproducible benchmark suite of DegradationModel on the reference scenarios of the notebooks:
+## Fig. 3 (a)-(e) and Fig. 4 of Paper [2] (40°C, 4.5 mm pipe, Sample A antioxidant, ti0 = 165 min),
+## the SUEZ PE100 film at 40°C in H2O and HOCl (0.4 mm, ti0 = 291.07 min, 9 months) and a 15-year pipe run.
+##
+## For every case and grid size nz: wall time (best of --repeats), peak traced memory (separate run under
+## tracemalloc), solver statistics (sol.stats) and the error on OIT, surface [CO] and Mw at the critical depth
+## against a tight-tolerance reference (rtol=1e-8 on a nz=--ref-nz grid, analytic Jacobian). The measured
+## runs use the model's default analytic Jacobian unless --jacobian is given (dense: the finite-difference
+## Jacobian of the notebooks, much slower). Results are written as JSON; --compare prints the time/accuracy
+## ratios against a previous JSON file to spot regressions.
+## Fig. 3d and Fig. 4 at nz=100 are also checked against the original notebook class by
+## benchmarks/check_regression.py.
+##
+## Usage (from the repository root):
+##     python benchmarks/bench_suite.py                                   # all cases, nz = 25 50 100
+##     python benchmarks/bench_suite.py --cases fig4 pipe15 --nz 25 50 --output new.json --compare old.json
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from degradation_model import DegradationModel
+
+# name: (description, simulation_mode, L (m), T (°C), DOC (ppm), duration (days), antioxidant, ti0_oit (min))
+CASES = {
+    'fig3a': ('Fig 3a 99 d 0 ppm', 'pipe', 4.5e-3, 40.0, 0.0, 99, 'sample_a', 165.0),
+    'fig3b': ('Fig 3b 2 d 5 ppm', 'pipe', 4.5e-3, 40.0, 5.0, 2, 'sample_a', 165.0),
+    'fig3c': ('Fig 3c 10 d 31.8 ppm', 'pipe', 4.5e-3, 40.0, 31.8, 10, 'sample_a', 165.0),
+    'fig3d': ('Fig 3d 51 d 66.8 ppm', 'pipe', 4.5e-3, 40.0, 66.8, 51, 'sample_a', 165.0),
+    'fig3e': ('Fig 3e 99 d 68.5 ppm', 'pipe', 4.5e-3, 40.0, 68.5, 99, 'sample_a', 165.0),
+    'fig4': ('Fig 4 99 d 66.5 ppm', 'pipe', 4.5e-3, 40.0, 66.5, 99, 'sample_a', 165.0),
+    'suez_h2o': ('SUEZ film 40C H2O 9 mo', 'film', 0.4e-3, 40.0, 0.0, 0.75 * 365.25, 'pe100', 291.07),
+    'suez_hocl': ('SUEZ film 40C HOCl 9 mo', 'film', 0.4e-3, 40.0, 0.05, 0.75 * 365.25, 'pe100', 291.07),
+    'pipe15': ('pipe 20C 1 ppm 15 yr', 'pipe', 4.5e-3, 20.0, 1.0, 15 * 365.25, 'default', 165.0),
+}
+
+OBSERVABLES = ('oit_avg', 'co_surface', 'mw_proxy')
+REFERENCE_LADDER = [
+    {'method': 'Radau', 'rtol': 1e-8, 'atol': 1e-12},
+    {'method': 'BDF', 'rtol': 1e-8, 'atol': 1e-12},
+    {'method': 'Radau', 'rtol': 1e-6, 'atol': 1e-10},
+]
+REFERENCE_JACOBIAN = 'analytic' # dense finite differences are too slow on the nz=201 reference grid
+STAT_KEYS = ('nfev', 'njev', 'nlu', 'n_steps', 'n_rejected', 'rhs_time_s', 'jac_time_s', 'linalg_time_s')
+
+
+def make_model(case, nz):
+    """Model and simulate() arguments of a case (same settings as the notebooks)."""
+    _, mode, L, T, DOC, days, antioxidant, ti0 = CASES[case]
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = DegradationModel(L=L, nz=nz, simulation_mode=mode)
+    model.ti0_oit = ti0
+    # Antioxidant content as computed in the notebooks (0.1 wt% of a 1178 g/mol phenol with n_AH sites)
+    if antioxidant == 'sample_a': # Fig. 3 / Fig. 4 cells
+        AH0_mult = (0.001 * model.dens0 / 1178 * model.n_AH) / model.AH0_conc
+    elif antioxidant == 'pe100': # SUEZ film cells
+        AH0_mult = (0.001 * (model.dens0 * 1000) / 1178 * model.n_AH) / model.AH0_conc
+    else:
+        AH0_mult = 1.0
+    return model, {'T_celsius': T, 'DOC_ppm': DOC, 't_end_years': days / 365.25, 'AH0_mult': AH0_mult}
+
+
+def simulate(model, run_args, n_timepoints, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return model.simulate(n_timepoints=n_timepoints, reducers=OBSERVABLES, **run_args, **kwargs)
+
+
+def run_case(case, nz, reference, n_timepoints=50, repeats=1, memory=True, jacobian='analytic'):
+    """Measurements of one case at one grid size (see module header)."""
+    model, run_args = make_model(case, nz)
+    wall = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        sol = simulate(model, run_args, n_timepoints, fallback=True, jacobian=jacobian)
+        wall = min(wall, time.perf_counter() - start)
+    row = {'case': case, 'nz': nz, 'success': bool(sol.success), 'wall_time_s': wall}
+    row.update({key: sol.stats[key] for key in STAT_KEYS})
+    if sol.success: # Loosest fallback settings actually needed
+        row.update(method_used=sol.sim_params['method_used'], rtol_used=sol.sim_params['rtol_used'],
+                   atol_used=sol.sim_params['atol_used'])
+
+    if memory:
+        model, run_args = make_model(case, nz)
+        tracemalloc.start()
+        simulate(model, run_args, n_timepoints, fallback=True, jacobian=jacobian)
+        row['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+    if sol.success and reference is not None:
+        obs, ref = sol.observables, reference
+        row['err_oit_min'] = float(np.max(np.abs(obs['oit_avg'] - ref['oit_avg'])))
+        row['err_co_rel'] = float(np.max(np.abs(obs['co_surface'] - ref['co_surface'])) /
+                                  (np.max(np.abs(ref['co_surface'])) + 1e-300))
+        row['err_mw_rel'] = float(np.max(np.abs(obs['mw_proxy'] - ref['mw_proxy']) / ref['mw_proxy']))
+    return row
+
+
+def reference_observables(case, ref_nz, n_timepoints=50):
+    """Tight-tolerance solution of a case on the reference grid (observables only)."""
+    model, run_args = make_model(case, ref_nz)
+    start = time.perf_counter()
+    sol = simulate(model, run_args, n_timepoints, fallback=REFERENCE_LADDER, keep_state=False,
+                   jacobian=REFERENCE_JACOBIAN)
+    if not sol.success:
+        print(f"  reference FAILED for {case}: {sol.message}")
+        return None, time.perf_counter() - start
+    return sol.observables, time.perf_counter() - start
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'git_commit': commit,
+            'python': platform.python_version(), 'numpy': np.__version__, 'scipy': scipy.__version__,
+            'machine': platform.machine(), 'processor': platform.processor() or None}
+
+
+def run_suite(cases=None, nz_values=(25, 50, 100), ref_nz=201, n_timepoints=50, repeats=1, memory=True,
+              jacobian='analytic'):
+    """
+    Run the benchmark cases.
+
+    Args:
+        cases (sequence of str or None): Keys of CASES (default: all).
+        nz_values (sequence of int): Grid sizes measured.
+        ref_nz (int): Grid size of the tight-tolerance reference (None: no accuracy comparison).
+        n_timepoints (int): Output times of every run (the errors are the maxima over them).
+        repeats (int): Timed runs per measurement (the best is kept).
+        memory (bool): Measure the peak traced memory (one extra run per measurement).
+        jacobian (str or None): Jacobian of the measured runs (see DegradationModel.simulate).
+
+    Returns:
+        dict: {'environment': ..., 'settings': ..., 'results': [one dict per (case, nz)],
+               'references': {case: wall time of the reference run}}.
+    """
+    cases = list(cases or CASES)
+    results, references = [], {}
+    for case in cases:
+        reference = None
+        if ref_nz:
+            reference, references[case] = reference_observables(case, ref_nz, n_timepoints)
+        for nz in nz_values:
+            row = run_case(case, nz, reference, n_timepoints, repeats, memory, jacobian)
+            row['description'] = CASES[case][0]
+            results.append(row)
+            print(format_row(row), flush=True)
+    return {'environment': environment(),
+            'settings': {'cases': cases, 'nz_values': list(nz_values), 'ref_nz': ref_nz,
+                         'n_timepoints': n_timepoints, 'repeats': repeats, 'jacobian': jacobian,
+                         'reference_ladder': REFERENCE_LADDER, 'reference_jacobian': REFERENCE_JACOBIAN},
+            'results': results, 'references': references}
+
+
+def format_row(row):
+    def value(key, fmt):
+        return format(row[key], fmt) if row.get(key) is not None else '-'
+    return (f"{row['case']:<10} {row['nz']:>4} {value('wall_time_s', '9.3f')} {value('peak_memory_mb', '9.1f')} "
+            f"{value('nfev', '7d')} {value('n_steps', '6d')} {value('nlu', '6d')} "
+            f"{value('linalg_time_s', '8.3f')} {value('err_oit_min', '10.3g')} {value('err_co_rel', '10.2e')} "
+            f"{value('err_mw_rel', '10.2e')}" + ("" if row['success'] else "  FAILED"))
+
+
+def compare(old, new):
+    """Print time and accuracy ratios new/old for the (case, nz) pairs present in both result files."""
+    previous = {(r['case'], r['nz']): r for r in old['results']}
+    print(f"\nComparison with {old['environment'].get('git_commit')} ({old['environment'].get('date')}): new/old")
+    print(f"{'case':<10} {'nz':>4} {'time':>7} {'nfev':>7} {'memory':>7} {'OIT err':>8}")
+    for row in new['results']:
+        before = previous.get((row['case'], row['nz']))
+        if before is None:
+            continue
+
+        def ratio(key):
+            if row.get(key) is None or not before.get(key):
+                return '      -'
+            return f"{row[key] / before[key]:7.2f}"
+        print(f"{row['case']:<10} {row['nz']:>4} {ratio('wall_time_s')} {ratio('nfev')} "
+              f"{ratio('peak_memory_mb')} {ratio('err_oit_min'):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), help="cases to run (default: all)")
+    parser.add_argument('--nz', nargs='+', type=int, default=[25, 50, 100], help="grid sizes")
+    parser.add_argument('--ref-nz', type=int, default=201, help="grid size of the reference (0: no reference)")
+    parser.add_argument('--timepoints', type=int, default=50, help="output times per run")
+    parser.add_argument('--repeats', type=int, default=1, help="timed runs per measurement (best kept)")
+    parser.add_argument('--jacobian', choices=['analytic', 'sparsity', 'dense'], default='analytic',
+                        help="Jacobian of the measured runs (dense: finite differences on the full matrix)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc runs")
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         'results', 'bench_suite.json'), help="JSON output file")
+    parser.add_argument('--compare', help="previous JSON output to compare with")
+    args = parser.parse_args()
+
+    print(f"{'case':<10} {'nz':>4} {'time (s)':>9} {'peak (MB)':>9} {'nfev':>7} {'steps':>6} {'nlu':>6} "
+          f"{'LU+solve':>8} {'OIT err':>10} {'CO err':>10} {'Mw err':>10}")
+    report = run_suite(args.cases, args.nz, args.ref_nz or None, args.timepoints, args.repeats, not args.no_memory,
+                       None if args.jacobian == 'dense' else args.jacobian)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
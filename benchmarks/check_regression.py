@@ -0,0 +1,193 @@
+## Regression check of DegradationModel against the original notebook class (DegradationModel of
+## code.ipynb at the baseline commit) on cases where the solver settings matter: Fig. 3d (66.8 ppm,
+## 51 d) and Fig. 4 (66.5 ppm, 99 d) of Paper [2] at nz=100, Radau rtol=1e-4 as in the notebooks.
+##
+## The baseline solutions (OIT average, surface [CO], Mw at the critical depth at 50 output times) are
+## stored in results/baseline_reference.json; --update-reference recomputes them with the notebook
+## class extracted from git (slow: about 3 and 5 minutes). The current model is run with its default
+## settings and fallback=True; the script exits with status 1 if a case fails or deviates.
+##
+## It also checks that the thickness-averaged OIT of Fig. 4 on a non-uniform mesh (mesh='surface', nz=25) is
+## the same from the streamed observables, observe(), and the batch rendering of the state (in memory and
+## from a result store): the rendered figures must not depend on how the result was kept.
+##
+## Finally a constant schedules.Schedule must reproduce the scalar run (Fig. 4, 15-year pipe, SUEZ HOCl film at
+## nz=25): to round-off with the analytic Jacobian, and to the finite-difference noise with the dense one.
+##
+## Usage (from the repository root):
+##     python benchmarks/check_regression.py
+##     python benchmarks/check_regression.py --update-reference
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench_suite import make_model
+from degradation_model import DegradationModel
+from plot_functions import _open_result, _result_series, _result_view
+from result_store import save_result
+from schedules import Schedule
+
+BASELINE_COMMIT = '70ff366'
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'baseline_reference.json')
+REGRESSION_CASES = [('fig3d', 100), ('fig4', 100)]
+N_TIMEPOINTS = 50
+OBSERVABLES = ('oit_avg', 'co_surface', 'mw_proxy')
+# Accepted deviations: OIT in minutes, [CO] relative to its maximum, Mw relative
+TOLERANCES = {'oit_avg': 1.0, 'co_surface': 1e-2, 'mw_proxy': 1e-2}
+# Accepted difference (min) between the OIT averages of the rendering paths (same states)
+RENDER_TOLERANCE = 1e-6
+SCHEDULE_CASES = ('fig4', 'pipe15', 'suez_hocl')
+# Accepted relative difference of the observables between a constant Schedule and the scalar run, per Jacobian
+# (the finite-difference Jacobian perturbs the states, so both runs see slightly different matrices)
+SCHEDULE_TOLERANCES = {'analytic': 1e-12, None: 1e-5}
+
+
+def baseline_model_class():
+    """DegradationModel class of code.ipynb at BASELINE_COMMIT (read from git, no file written)."""
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    notebook = json.loads(subprocess.run(['git', 'show', f'{BASELINE_COMMIT}:code.ipynb'], cwd=root,
+                                         capture_output=True, text=True, check=True).stdout)
+    source = next(''.join(cell['source']) for cell in notebook['cells']
+                  if cell['cell_type'] == 'code' and 'class DegradationModel' in ''.join(cell['source']))
+    namespace = {'np': np, 'solve_ivp': solve_ivp, 'time': time}
+    exec(source, namespace)
+    return namespace['DegradationModel']
+
+
+def reference_case(baseline_class, case, nz):
+    """Observables of the baseline notebook class (computed by the current observe() on its states)."""
+    model, run_args = make_model(case, nz)
+    with contextlib.redirect_stdout(io.StringIO()):
+        baseline = baseline_class(L=model.L, nz=nz, simulation_mode=model.simulation_mode)
+        baseline.ti0_oit = model.ti0_oit
+        start = time.time()
+        sol = baseline.simulate(run_args['T_celsius'], run_args['DOC_ppm'], run_args['t_end_years'],
+                                n_timepoints=N_TIMEPOINTS, AH0_mult=run_args['AH0_mult'])
+    if not sol.success:
+        raise RuntimeError(f"baseline run of {case} (nz={nz}) failed: {sol.message}")
+    C = sol.y.reshape((model.n_species, model.nz, -1))
+    AH0_actual_conc = model.AH0_conc * run_args['AH0_mult']
+    row = {'wall_time_s': time.time() - start, 't': sol.t.tolist()}
+    row.update({name: np.asarray(model._observable(name, C, AH0_actual_conc)).tolist() for name in OBSERVABLES})
+    return row
+
+
+def update_reference():
+    baseline_class = baseline_model_class()
+    reference = {'source': f"DegradationModel of code.ipynb at commit {BASELINE_COMMIT}, Radau rtol=1e-4 "
+                           f"atol=1e-7, dense finite-difference Jacobian", 'cases': {}}
+    for case, nz in REGRESSION_CASES:
+        reference['cases'][f'{case}:{nz}'] = row = reference_case(baseline_class, case, nz)
+        print(f"{case} nz={nz}: baseline solved in {row['wall_time_s']:.1f} s, final OIT {row['oit_avg'][-1]:.2f} min")
+    os.makedirs(os.path.dirname(REFERENCE_PATH), exist_ok=True)
+    with open(REFERENCE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(reference, f, indent=1)
+    print(f"Reference written to {REFERENCE_PATH}")
+
+
+def check():
+    """Compare the current model with the stored baseline; returns True if every case passes."""
+    with open(REFERENCE_PATH, encoding='utf-8') as f:
+        reference = json.load(f)
+    passed = True
+    for case, nz in REGRESSION_CASES:
+        ref = reference['cases'][f'{case}:{nz}']
+        model, run_args = make_model(case, nz)
+        start = time.time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            sol = model.simulate(n_timepoints=N_TIMEPOINTS, reducers=OBSERVABLES, keep_state=False, fallback=True,
+                                 **run_args)
+        wall = time.time() - start
+        if not sol.success:
+            print(f"FAIL {case:<6} nz={nz}: {sol.message} ({wall:.1f} s)")
+            passed = False
+            continue
+        errors = {
+            'oit_avg': np.max(np.abs(sol.observables['oit_avg'] - ref['oit_avg'])),
+            'co_surface': np.max(np.abs(sol.observables['co_surface'] - ref['co_surface'])) /
+                          (np.max(np.abs(ref['co_surface'])) + 1e-300),
+            'mw_proxy': np.max(np.abs(sol.observables['mw_proxy'] - ref['mw_proxy']) / np.abs(ref['mw_proxy'])),
+        }
+        ok = all(errors[name] <= TOLERANCES[name] for name in OBSERVABLES)
+        passed &= ok
+        print(f"{'ok  ' if ok else 'FAIL'} {case:<6} nz={nz}: OIT error {errors['oit_avg']:.3g} min, "
+              f"CO {errors['co_surface']:.2e}, Mw {errors['mw_proxy']:.2e}; final OIT "
+              f"{sol.observables['oit_avg'][-1]:.2f} (baseline {ref['oit_avg'][-1]:.2f}) min; "
+              f"{sol.sim_params['method_used']} rtol={sol.sim_params['rtol_used']:.0e} atol={sol.sim_params['atol_used']:.0e}, "
+              f"{wall:.1f} s (baseline {ref['wall_time_s']:.1f} s)")
+    return passed
+
+
+def check_rendering():
+    """Thickness-averaged OIT of the rendering paths on a non-uniform mesh; returns True if they agree."""
+    _, run_args = make_model('fig4', 25)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = DegradationModel(L=4.5e-3, nz=25, simulation_mode='pipe', mesh='surface')
+        model.ti0_oit = 165.0
+        sol = model.simulate(n_timepoints=N_TIMEPOINTS, reducers=('oit_avg', 'co_surface'), dense_output=True,
+                             **run_args)
+    if not sol.success:
+        print(f"FAIL render: {sol.message}")
+        return False
+    series = {'reducer': sol.observables['oit_avg'],
+              'observe': model.observe(sol, sol.t / (365.25 * 24 * 3600), ('oit_avg',))['oit_avg'],
+              'render (state)': _result_series(_result_view(sol, model))[0]}
+    with tempfile.TemporaryDirectory() as directory:
+        path = save_result(os.path.join(directory, 'fig4_surface'), sol, model)
+        series['render (stored)'] = _result_series(_open_result(path))[0]
+    deviation = max(np.max(np.abs(values - series['reducer'])) for values in series.values())
+    ok = deviation <= RENDER_TOLERANCE
+    print(f"{'ok  ' if ok else 'FAIL'} render nz=25 surface mesh: OIT paths {', '.join(series)} agree within "
+          f"{deviation:.2g} min (final OIT {series['reducer'][-1]:.2f} min)")
+    return ok
+
+
+def check_schedules():
+    """Constant schedules against scalar T and DOC; returns True if every case matches."""
+    passed = True
+    for case in SCHEDULE_CASES:
+        for jacobian, tolerance in SCHEDULE_TOLERANCES.items():
+            model, run_args = make_model(case, 25)
+            scheduled_args = dict(run_args, T_celsius=Schedule.constant(run_args['T_celsius']),
+                                  DOC_ppm=Schedule.constant(run_args['DOC_ppm']))
+            with contextlib.redirect_stdout(io.StringIO()):
+                scalar = model.simulate(n_timepoints=20, reducers=OBSERVABLES, keep_state=False, jacobian=jacobian,
+                                        **run_args)
+                scheduled = model.simulate(n_timepoints=20, reducers=OBSERVABLES, keep_state=False,
+                                           jacobian=jacobian, **scheduled_args)
+            label = f"schedule {case:<9} jacobian={jacobian}"
+            if not (scalar.success and scheduled.success):
+                print(f"FAIL {label}: {scalar.message if not scalar.success else scheduled.message}")
+                passed = False
+                continue
+            deviation = max(np.max(np.abs(scheduled.observables[name] - scalar.observables[name])) /
+                            (np.max(np.abs(scalar.observables[name])) + 1e-300) for name in OBSERVABLES)
+            ok = deviation <= tolerance
+            passed &= ok
+            print(f"{'ok  ' if ok else 'FAIL'} {label}: constant schedule within {deviation:.1e} of the scalar run "
+                  f"(tolerance {tolerance:.0e}), {scheduled.stats['n_steps']} vs {scalar.stats['n_steps']} steps")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regression check against the original notebook class")
+    parser.add_argument('--update-reference', action='store_true', help="recompute the baseline solutions")
+    args = parser.parse_args()
+    if args.update_reference:
+        update_reference()
+    passed = check()
+    passed &= check_rendering()
+    passed &= check_schedules()
+    sys.exit(0 if passed else 1)
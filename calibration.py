@@ -0,0 +1,344 @@
+## This module contains a least-squares calibration engine fitting DegradationModel parameters
+## (pre-exponential factors of k_coeffs / beta_coeffs, and per-experiment simulate() arguments
+## such as the effective DOC) to experimental OIT and carbonyl series (SUEZ PE100 data...).
+##
+## Usage:
+##     hocl = make_dataset('HOCl', experimental_times_months_hocl, T_celsius=40, DOC_ppm=0.05,
+##                         oit=experimental_oit_hocl, AH0_mult=ah0_multiplier)
+##     h2o = make_dataset('H2O', experimental_times_months_H2O, T_celsius=40, DOC_ppm=0.05,
+##                        oit=experimental_oit_H2O, carbonyl=experimental_carbonyl_index_H2O,
+##                        AH0_mult=ah0_multiplier)
+##     calib = Calibration([h2o, hocl], ['k_coeffs.k8d', 'beta_coeffs.beta0', 'HOCl.DOC_ppm'],
+##                         model_args={'L': 0.4e-3, 'nz': 25, 'simulation_mode': 'film'},
+##                         model_attributes={'ti0_oit': 271.07})
+##     fit = calib.fit()
+##     print(fit['summary'])
+
+import contextlib
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+
+from degradation_model import DegradationModel
+from simulation_cache import SimulationCache
+
+# Residual given to a dataset whose simulation failed (keeps the optimizer away from that region)
+FAILURE_RESIDUAL = 1e3
+
+
+def make_dataset(label, times_months, T_celsius, DOC_ppm, oit=None, carbonyl=None,
+                 oit_sigma=None, carbonyl_sigma=None, carbonyl_scale=None, **simulate_args):
+    """
+    One aging experiment to fit.
+
+    Args:
+        label (str): Name of the experiment (also used as prefix of its fitted run parameters,
+                     e.g. 'HOCl.DOC_ppm').
+        times_months (array-like): Measurement times (months).
+        T_celsius (float): Aging temperature (°C).
+        DOC_ppm (float): (Effective) DOC concentration used to simulate the aging medium (ppm).
+        oit (array-like or None): Measured OIT (min), NaN where there is no measurement.
+        carbonyl (array-like or None): Measured carbonyl index (a.u.), NaN where missing.
+        oit_sigma (float or None): OIT measurement uncertainty (min), used to weight the residuals.
+                                   Default: 5% of the largest measured OIT.
+        carbonyl_sigma (float or None): Same for the carbonyl index. Default: 10% of its largest value.
+        carbonyl_scale (float or None): Factor converting the simulated surface [CO] (mol/L) to the
+                                        carbonyl index. None: fitted in closed form at each evaluation.
+        **simulate_args: Other simulate() arguments for this experiment (AH0_mult, O2_sat_mult...).
+
+    Returns:
+        dict: The dataset.
+    """
+    times_months = np.asarray(times_months, dtype=float)
+    dataset = {'label': label, 'times_months': times_months, 'carbonyl_scale': carbonyl_scale,
+               'run_args': dict(simulate_args, T_celsius=T_celsius, DOC_ppm=DOC_ppm)}
+    for name, values, sigma, default_fraction in (('oit', oit, oit_sigma, 0.05),
+                                                  ('carbonyl', carbonyl, carbonyl_sigma, 0.10)):
+        if values is None:
+            dataset[name] = None
+            continue
+        values = np.asarray(values, dtype=float)
+        if values.shape != times_months.shape:
+            raise ValueError(f"Dataset '{label}': {name} has {values.size} values for {times_months.size} times")
+        if np.all(np.isnan(values)):
+            raise ValueError(f"Dataset '{label}': {name} contains no measurement")
+        dataset[name] = values
+        dataset[name + '_sigma'] = sigma if sigma is not None else default_fraction * np.nanmax(np.abs(values))
+    if dataset['oit'] is None and dataset['carbonyl'] is None:
+        raise ValueError(f"Dataset '{label}' has neither OIT nor carbonyl data")
+    return dataset
+
+
+def apply_parameters(model, run_args, names, values):
+    """
+    Write parameter values into a model and into the run arguments of the datasets.
+
+    Args:
+        model: DegradationModel instance (its k_coeffs / beta_coeffs are modified in place).
+        run_args (dict): {dataset label: simulate() arguments}, modified in place.
+        names (list of str): 'k_coeffs.<name>' / 'beta_coeffs.<name>' (pre-exponential factor,
+                             activation energy unchanged) or '<dataset label>.<simulate argument>'.
+        values (array-like): Parameter values (linear scale).
+    """
+    for name, value in zip(names, values):
+        group, key = name.split('.', 1)
+        if group in ('k_coeffs', 'beta_coeffs'):
+            coeffs = getattr(model, group)
+            Ea, _ = coeffs[key]
+            coeffs[key] = (Ea, float(value))
+            # In film mode betaL follows beta0 (see DegradationModel.__init__) unless fitted itself
+            if (group == 'beta_coeffs' and key == 'beta0' and model.simulation_mode == 'film'
+                    and 'beta_coeffs.betaL' not in names):
+                coeffs['betaL'] = (coeffs['betaL'][0], float(value))
+        else:
+            run_args[group][key] = float(value)
+
+
+def simulate_datasets(values, names, datasets, model_class=DegradationModel, model_args=None,
+                      model_attributes=None, simulate_kwargs=None, cache_dir=None):
+    """
+    Simulate every dataset for one parameter vector (runs in the worker processes).
+
+    Returns:
+        dict: 'residuals' (weighted, concatenated over the datasets), 'predictions'
+              ({label: {'oit': ..., 'carbonyl': ...}}), 'carbonyl_scales', 'failed' (labels),
+              'cache_hits' and 'wall_time_s'.
+    """
+    start = time.time()
+    cache = SimulationCache(cache_dir) if cache_dir is not None else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = model_class(**(model_args or {}))
+        for name, value in (model_attributes or {}).items():
+            setattr(model, name, value)
+    run_args = {ds['label']: dict(ds['run_args']) for ds in datasets}
+    apply_parameters(model, run_args, names, values)
+
+    residuals, predictions, scales, failed = [], {}, {}, []
+    for ds in datasets:
+        times_years = ds['times_months'] / 12
+        args = {'fallback': True, 'jacobian': 'analytic'}
+        args.update(simulate_kwargs or {})
+        args.update(run_args[ds['label']])
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                sol, observed = model.simulate_at(times_years=times_years, observables=('oit_avg', 'co_surface'),
+                                                  cache=cache, **args)
+        except Exception:
+            observed = None
+        pred = {}
+        for name in ('oit', 'carbonyl'):
+            exp = ds[name]
+            if exp is None:
+                continue
+            mask = ~np.isnan(exp)
+            if observed is None:
+                residuals.append(np.full(mask.sum(), FAILURE_RESIDUAL))
+                continue
+            if name == 'oit':
+                sim = observed['oit_avg']
+            else:
+                co = observed['co_surface']
+                scale = ds['carbonyl_scale']
+                if scale is None: # Least-squares scale factor (closed form)
+                    denom = np.dot(co[mask], co[mask])
+                    scale = np.dot(co[mask], exp[mask]) / denom if denom > 0 else 0.0
+                scales[ds['label']] = scale
+                sim = scale * co
+            pred[name] = sim
+            residuals.append((sim[mask] - exp[mask]) / ds[name + '_sigma'])
+        if observed is None:
+            failed.append(ds['label'])
+        predictions[ds['label']] = pred
+
+    return {'residuals': np.concatenate(residuals), 'predictions': predictions, 'carbonyl_scales': scales,
+            'failed': failed, 'cache_hits': cache.hits if cache is not None else 0,
+            'wall_time_s': time.time() - start}
+
+
+class Calibration:
+    """
+    Weighted least-squares fit of model parameters to several experiments.
+
+    Parameters are fitted as log10 of their value. The Jacobian is computed by forward
+    finite differences, the n_params+1 perturbed runs being simulated in parallel
+    (ProcessPoolExecutor). Every forward run goes through the SimulationCache, so
+    re-running a calibration (or an optimizer step revisiting a point) reuses the stored runs.
+    """
+
+    def __init__(self, datasets, parameters, model_class=DegradationModel, model_args=None,
+                 model_attributes=None, simulate_kwargs=None, cache_dir="sim_cache",
+                 n_workers=None, fd_step=1e-3, verbose=True):
+        """
+        Args:
+            datasets (list of dict): From make_dataset().
+            parameters (list of str): Fitted parameters, e.g. ['k_coeffs.k8d', 'beta_coeffs.beta0',
+                                      'HOCl.DOC_ppm'] (see apply_parameters).
+            model_class (type): Model class (must be importable by the worker processes).
+            model_args (dict or None): Constructor arguments (L, nz, simulation_mode...).
+            model_attributes (dict or None): Attributes set after construction (e.g. {'ti0_oit': 271.07}).
+            simulate_kwargs (dict or None): Solver settings common to all runs (n_timepoints, rtol...;
+                                            fallback=True and jacobian='analytic' unless given).
+            cache_dir (str or None): SimulationCache directory (None: no cache).
+            n_workers (int or None): Number of processes for the finite differences (1: serial).
+            fd_step (float): Finite-difference step on log10(parameter).
+            verbose (bool): Print the cost of each iteration.
+        """
+        labels = [ds['label'] for ds in datasets]
+        if len(set(labels)) != len(labels):
+            raise ValueError(f"Dataset labels must be unique: {labels}")
+        for name in parameters:
+            group = name.split('.', 1)[0]
+            if '.' not in name or (group not in ('k_coeffs', 'beta_coeffs') and group not in labels):
+                raise ValueError(f"Unknown parameter '{name}': use 'k_coeffs.<name>', 'beta_coeffs.<name>' "
+                                 f"or '<dataset label>.<simulate argument>' with a label in {labels}")
+        self.datasets = datasets
+        self.parameters = list(parameters)
+        self.model_class = model_class
+        self.model_args = model_args or {}
+        self.model_attributes = model_attributes or {}
+        self.simulate_kwargs = simulate_kwargs or {}
+        self.cache_dir = cache_dir
+        self.n_workers = n_workers
+        self.fd_step = fd_step
+        self.verbose = verbose
+        self.history = []
+        self._evaluations = {}
+        self._pool = None
+
+    def initial_values(self):
+        """Current parameter values (linear scale) of the model and datasets."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = self.model_class(**self.model_args)
+        values = []
+        for name in self.parameters:
+            group, key = name.split('.', 1)
+            if group in ('k_coeffs', 'beta_coeffs'):
+                values.append(getattr(model, group)[key][1])
+            else:
+                ds = next(ds for ds in self.datasets if ds['label'] == group)
+                if key not in ds['run_args']:
+                    raise ValueError(f"'{name}': give an initial value of {key} in make_dataset('{group}', ...)")
+                values.append(ds['run_args'][key])
+        values = np.asarray(values, dtype=float)
+        if np.any(values <= 0):
+            raise ValueError("Fitted parameters must be strictly positive (they are fitted in log10)")
+        return values
+
+    def _evaluate_many(self, thetas):
+        """Simulate the datasets for several log10 parameter vectors (memoized, in parallel)."""
+        keys = [tuple(np.round(theta, 12)) for theta in thetas]
+        todo = [key for key in dict.fromkeys(keys) if key not in self._evaluations]
+        args = (self.parameters, self.datasets, self.model_class, self.model_args,
+                self.model_attributes, self.simulate_kwargs, self.cache_dir)
+        if self._pool is None or len(todo) == 1:
+            results = [simulate_datasets(10.0 ** np.array(key), *args) for key in todo]
+        else:
+            futures = [self._pool.submit(simulate_datasets, 10.0 ** np.array(key), *args) for key in todo]
+            results = [future.result() for future in futures]
+        for key, result in zip(todo, results):
+            self._evaluations[key] = result
+        return [self._evaluations[key] for key in keys], len(todo)
+
+    def residuals(self, theta):
+        """Weighted residuals for log10 parameters theta."""
+        (result,), _ = self._evaluate_many([theta])
+        return result['residuals']
+
+    def jacobian(self, theta):
+        """Forward finite-difference Jacobian d residuals / d log10(parameters), runs in parallel."""
+        start = time.time()
+        thetas = [theta] + [theta + self.fd_step * e for e in np.eye(len(theta))]
+        results, n_runs = self._evaluate_many(thetas)
+        r0 = results[0]['residuals']
+        J = np.column_stack([(r['residuals'] - r0) / self.fd_step for r in results[1:]])
+
+        cost = 0.5 * np.dot(r0, r0)
+        self.history.append({
+            'iteration': len(self.history), 'cost': cost,
+            **{name: value for name, value in zip(self.parameters, 10.0 ** theta)},
+            'n_simulations': n_runs * len(self.datasets), 'wall_time_s': time.time() - start,
+            'failed': sum(len(r['failed']) > 0 for r in results),
+        })
+        if self.verbose:
+            h = self.history[-1]
+            values = ", ".join(f"{name}={10.0 ** t:.4g}" for name, t in zip(self.parameters, theta))
+            print(f"Iteration {h['iteration']}: cost={cost:.5g} ({values}) - {h['n_simulations']} simulations "
+                  f"in {h['wall_time_s']:.1f} s" + (f", {h['failed']} failed" if h['failed'] else ""))
+        return J
+
+    def fit(self, initial_values=None, bounds_factor=1e3, max_nfev=30, xtol=1e-4, ftol=1e-6):
+        """
+        Run the calibration.
+
+        Args:
+            initial_values (array-like or None): Starting values (default: initial_values()).
+            bounds_factor (float): Each parameter is kept within [x0/bounds_factor, x0*bounds_factor].
+            max_nfev (int): Maximum number of residual evaluations.
+            xtol, ftol (float): Convergence tolerances of scipy.optimize.least_squares.
+
+        Returns:
+            dict: 'values' (fitted, linear scale), 'std_log10' (standard errors on log10),
+                  'ci95' ((low, high) per parameter), 'correlation', 'cost', 'optimizer'
+                  (least_squares result), 'history' (cost per iteration, DataFrame),
+                  'predictions' and 'carbonyl_scales' at the optimum, 'summary' (DataFrame).
+        """
+        x0 = np.asarray(initial_values if initial_values is not None else self.initial_values(), dtype=float)
+        theta0 = np.log10(x0)
+        bounds = (theta0 - np.log10(bounds_factor), theta0 + np.log10(bounds_factor))
+        self.history = []
+        start = time.time()
+
+        n_workers = self.n_workers if self.n_workers is not None else len(self.parameters) + 1
+        with contextlib.ExitStack() as stack:
+            if n_workers > 1:
+                self._pool = stack.enter_context(ProcessPoolExecutor(max_workers=n_workers))
+            try:
+                opt = least_squares(self.residuals, theta0, jac=self.jacobian, bounds=bounds,
+                                    method='trf', x_scale='jac', max_nfev=max_nfev, xtol=xtol, ftol=ftol)
+            finally:
+                self._pool = None
+
+        # Uncertainty: covariance of log10(parameters) from the Gauss-Newton approximation
+        n_obs, n_params = opt.fun.size, opt.x.size
+        dof = max(n_obs - n_params, 1)
+        s2 = 2 * opt.cost / dof
+        cov = s2 * np.linalg.pinv(opt.jac.T @ opt.jac)
+        std = np.sqrt(np.maximum(np.diag(cov), 0))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlation = cov / np.outer(std, std)
+
+        values = 10.0 ** opt.x
+        with np.errstate(over='ignore'): # Unidentifiable parameters give infinite intervals
+            ci95 = [(10.0 ** (t - 1.96 * s), 10.0 ** (t + 1.96 * s)) for t, s in zip(opt.x, std)]
+        (best,), _ = self._evaluate_many([opt.x])
+        summary = pd.DataFrame({
+            'parameter': self.parameters, 'initial': x0, 'fitted': values,
+            'std_log10': std, 'ci95_low': [c[0] for c in ci95], 'ci95_high': [c[1] for c in ci95],
+            'at_bound': (opt.active_mask != 0),
+        })
+        if self.verbose:
+            print(f"Calibration finished in {time.time() - start:.1f} s: {opt.message}")
+            print(f"  cost {0.5 * np.dot(self.residuals(theta0), self.residuals(theta0)):.5g} -> {opt.cost:.5g} "
+                  f"({n_obs} residuals, {n_params} parameters, {len(self._evaluations)} parameter sets simulated)")
+            print(summary.to_string(index=False))
+        return {
+            'values': dict(zip(self.parameters, values)), 'std_log10': dict(zip(self.parameters, std)),
+            'ci95': dict(zip(self.parameters, ci95)), 'correlation': correlation, 'cost': opt.cost,
+            'optimizer': opt, 'history': pd.DataFrame(self.history), 'predictions': best['predictions'],
+            'carbonyl_scales': best['carbonyl_scales'], 'summary': summary,
+        }
+
+    def apply(self, model, values):
+        """
+        Write fitted values into a model (k_coeffs / beta_coeffs) and return the
+        per-dataset simulate() arguments ({label: run_args}).
+        """
+        if isinstance(values, dict):
+            values = [values[name] for name in self.parameters]
+        run_args = {ds['label']: dict(ds['run_args']) for ds in self.datasets}
+        apply_parameters(model, run_args, self.parameters, values)
+        return run_args
@@ -0,0 +1,1359 @@
+## This module contains the Colin et al. (2009) PE degradation model (diffusion-reaction system, simulation and OIT).
+
+import numpy as np
+from scipy import sparse
+from scipy.integrate import OdeSolution, Radau, BDF, LSODA, RK23, RK45, DOP853
+from scipy.optimize import OptimizeResult
+import time
+
+from simulation_cache import UncacheableError
+
+SOLVER_METHODS = {'Radau': Radau, 'BDF': BDF, 'LSODA': LSODA, 'RK23': RK23, 'RK45': RK45, 'DOP853': DOP853}
+
+# Solver ladder used by simulate(..., fallback=True), from the notebooks' trial lists
+DEFAULT_FALLBACK = [
+    {'method': 'Radau', 'rtol': 1e-4, 'atol': 1e-7},
+    {'method': 'BDF',   'rtol': 1e-4, 'atol': 1e-7},
+    {'method': 'Radau', 'rtol': 1e-3, 'atol': 1e-6},
+    {'method': 'BDF',   'rtol': 1e-3, 'atol': 1e-6},
+    {'method': 'Radau', 'rtol': 1e-2, 'atol': 1e-5},
+    {'method': 'BDF',   'rtol': 1e-2, 'atol': 1e-5},
+    {'method': 'Radau', 'rtol': 1e-1, 'atol': 1e-4},
+    {'method': 'BDF',   'rtol': 1e-1, 'atol': 1e-4},
+]
+
+# A segment of the fallback integration is rejected (next ladder settings) despite a successful solver
+# status if a species that the equations keep non-negative drops below -(NEGATIVE_TOL * its largest
+# value + atol) or AH exceeds AH0 * AH0_mult * (1 + AH_EXCESS_TOL): AH is only consumed, so its initial
+# value bounds it
+NEGATIVE_TOL = 1e-3
+AH_EXCESS_TOL = 1e-2
+
+# Absolute tolerance of the radicals P and PO2 relative to the atol of simulate() (atol=1e-7 -> 1e-11 mol/L).
+# At ~1e-11 mol/L they are far below the atol of the other species and would not be error-controlled:
+# they then turn negative and blow up (Fig. 3d and Fig. 4 at nz=100, Fig. 3d at nz=50)
+RADICAL_ATOL_FACTOR = 1e-4
+
+# Relaxation time (s) of the DOC boundary value towards its schedule (time-dependent runs, see simulate)
+BOUNDARY_RELAXATION_S = 3600.0
+# Time step (s) of the finite-difference derivative of the scheduled DOC boundary value
+BOUNDARY_DERIVATIVE_STEP_S = 3600.0
+
+
+class SolverStats:
+    """
+    Counters and timers of one simulation (all segments and solver attempts), attached to
+    every result as sol.stats (dict, see as_dict).
+
+    The right-hand side, Jacobian and linear algebra (LU factorizations and solves of the
+    implicit methods) are timed by wrapping the callables given to / held by the solver.
+    The finite-difference Jacobians (jacobian=None or 'sparsity') evaluate the right-hand side:
+    that time is counted in the Jacobian time only. The first Jacobian (computed when the solver
+    is created) and everything inside LSODA's Fortran code are not split out.
+
+    Rejected attempts happen inside the solvers' step routines and are not reported by them:
+    n_rejected is estimated from the accepted steps (see record_step) and is a lower bound.
+    """
+
+    def __init__(self):
+        self.times = {'rhs': 0.0, 'jac': 0.0, 'linalg': 0.0}
+        self.calls = {'rhs': 0, 'jac': 0, 'lu': 0, 'solve_lu': 0}
+        self.step_t, self.step_h = [], []
+        self.n_rejected = 0
+        self.nfev = self.njev = self.nlu = 0
+        self.wall_time_s = 0.0
+
+    def wrap(self, func, kind, counter=None):
+        """Timed version of func; kind is 'rhs', 'jac' or 'linalg'."""
+        counter = counter or kind
+        times, calls = self.times, self.calls
+
+        def timed(*args):
+            start = time.perf_counter()
+            rhs_before = times['rhs']
+            result = func(*args)
+            elapsed = time.perf_counter() - start
+            if kind != 'rhs':
+                # Right-hand side calls made inside (finite-difference Jacobian) belong to this time
+                times['rhs'] = rhs_before
+            times[kind] += elapsed
+            calls[counter] += 1
+            return result
+        return timed
+
+    def instrument(self, solver):
+        """Time the Jacobian and linear algebra of a created solver (implicit methods)."""
+        if getattr(solver, 'jac', None) is not None and not isinstance(solver, LSODA):
+            solver.jac = self.wrap(solver.jac, 'jac')
+        if hasattr(solver, 'lu'):
+            solver.lu = self.wrap(solver.lu, 'linalg', 'lu')
+            solver.solve_lu = self.wrap(solver.solve_lu, 'linalg', 'solve_lu')
+
+    def record_step(self, t_old, t_new, h_proposed, t_bound):
+        """
+        Accepted step from t_old to t_new. A step shorter than the size proposed before it (and not cut
+        at t_bound) was preceded by at least one rejected attempt: n_rejected counts these steps, not the
+        attempts, and misses rejections followed by a step of the proposed size, so it is a lower bound.
+        """
+        h = t_new - t_old
+        self.step_t.append(t_new)
+        self.step_h.append(h)
+        if h_proposed is not None and h < h_proposed * (1 - 1e-10) and t_new != t_bound:
+            self.n_rejected += 1
+
+    def add_counts(self, nfev, njev, nlu):
+        self.nfev += nfev
+        self.njev += njev
+        self.nlu += nlu
+
+    def as_dict(self):
+        step_h = np.array(self.step_h)
+        other = self.wall_time_s - sum(self.times.values())
+        return {
+            'nfev': self.nfev, 'njev': self.njev, 'nlu': self.nlu,
+            'n_steps': len(self.step_h), 'n_rejected': self.n_rejected,
+            'h_min_s': float(step_h.min()) if len(step_h) else None,
+            'h_max_s': float(step_h.max()) if len(step_h) else None,
+            'step_t': np.array(self.step_t), 'step_h': step_h,
+            'wall_time_s': self.wall_time_s, 'rhs_time_s': self.times['rhs'], 'jac_time_s': self.times['jac'],
+            'linalg_time_s': self.times['linalg'], 'other_time_s': max(other, 0.0),
+            'rhs_calls': self.calls['rhs'], 'jac_calls': self.calls['jac'],
+            'lu_calls': self.calls['lu'], 'solve_lu_calls': self.calls['solve_lu'],
+        }
+
+
+def format_stats(stats):
+    """One-line summary of sol.stats, e.g. for the logs of long runs."""
+    return (f"{stats['n_steps']} steps (≥{stats['n_rejected']} with rejections, estimated), nfev={stats['nfev']}, "
+            f"njev={stats['njev']}, nlu={stats['nlu']}; wall {stats['wall_time_s']:.2f} s = "
+            f"RHS {stats['rhs_time_s']:.2f} + Jacobian {stats['jac_time_s']:.2f} + "
+            f"linear algebra {stats['linalg_time_s']:.2f} + other {stats['other_time_s']:.2f} s")
+
+
+def lifetime_years(times_years, mw_proxy, MF_crit):
+    """
+    First time at which Mw at the critical depth (observable 'mw_proxy') falls to MF_crit
+    (end-of-life criterion, Paper [3]), linearly interpolated between the output times.
+
+    Args:
+        times_years (numpy.ndarray): Output times (years), shape (nt,).
+        mw_proxy (numpy.ndarray): Mw (kg/mol), shape (nt,) or (..., nt) for several runs.
+        MF_crit (float): Critical Mw (kg/mol).
+
+    Returns:
+        float or numpy.ndarray: Lifetime (years), shape mw_proxy.shape[:-1]; inf if MF_crit is not reached.
+    """
+    times_years = np.asarray(times_years, dtype=float)
+    mw = np.asarray(mw_proxy, dtype=float)
+    below = mw <= MF_crit # NaN (failed run) counts as not reached
+    reached = below.any(axis=-1)
+    k = np.maximum(np.argmax(below, axis=-1), 1)[..., None]
+    mw_a = np.take_along_axis(mw, k - 1, axis=-1)[..., 0]
+    mw_b = np.take_along_axis(mw, k, axis=-1)[..., 0]
+    t_a, t_b = times_years[k[..., 0] - 1], times_years[k[..., 0]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.clip(np.where(mw_a > mw_b, (mw_a - MF_crit) / (mw_a - mw_b), 1.0), 0.0, 1.0)
+    life = np.where(below[..., 0], times_years[0], t_a + fraction * (t_b - t_a))
+    life = np.where(reached, life, np.inf)
+    return float(life) if life.ndim == 0 else life
+
+
+class DegradationModel:
+    """
+    Implementation of Colin et al. (2009) PE pipe degradation model
+    with chlorine dioxide (DOC) exposure, focusing on diffusion-reaction coupling.
+    Can be adapted for film simulations by changing boundary conditions.
+
+    References:
+    [1] Colin, X., et al. (2009). Polymer Engineering & Science, 49(7), 1429-1437. (Part I)
+    [2] Colin, X., et al. (2009). Polymer Engineering & Science, 49(8), 1642-1652. (Part II)
+    [3] Colin, X., et al. (2009). Macromolecular Symposia, 286(1), 81-88.
+    """
+
+    def __init__(self, L=4.5e-3, nz=100, Mw0=150, dens0=0.95, densa=0.85, Xc=0.45, simulation_mode='pipe',
+                 mesh='uniform', mesh_stretch=2.5):
+        """
+        Initialize model parameters, grid, and species indices.
+
+        Args:
+            L (float): Pipe wall thickness (m) or Film thickness (m).
+            nz (int): Number of grid points for spatial discretization.
+            Mw0 (float): Initial molecular weight of PE (Kg/mol).
+            dens0 (float): Density of PE (Kg/L).
+            simulation_mode (str): 'pipe' or 'film'. Determines boundary conditions.
+            mesh (str or array-like): 'uniform', 'surface' (nodes clustered near z=0 and z=L,
+                                      tanh stretching) or the node positions (m) themselves,
+                                      from 0 to L (e.g. from adapted_mesh); nz is then len(mesh).
+            mesh_stretch (float): Clustering strength of the 'surface' mesh (ratio of the
+                                  central to the surface spacing is about cosh(mesh_stretch)**2).
+
+        Non-uniform meshes pay off for pipes, where the fronts stay near the inner surface
+        (benchmarks/bench_mesh.py, error on Mw at the critical depth against nz=401): an adapted
+        mesh with nz=40 is as accurate as the uniform nz=100 grid on Fig. 4 and on a 15-year
+        run, and 'surface' is 1.5-8x more accurate than uniform at the same nz (15 to 40). They do not reach
+        uniform nz=100 accuracy with nz=25 in general (15-year run: 1.4e-2 adapted, against
+        9.2e-3). For films (0.4 mm, degraded nearly homogeneously) keep the uniform mesh:
+        'surface' is less accurate than uniform at the same nz there (SUEZ film, nz=25: 1.5e-3
+        against 2.7e-4). Point values on a steep front (Mw at critical_depth_m) depend on where
+        the nodes fall, so check a new mesh against a finer run before relying on it. Average
+        profiles over the thickness with thickness_average (avg_weights), not np.mean.
+        """
+        self.L = L
+        self.z = self._make_mesh(mesh, L, nz, mesh_stretch) # Grid points (m)
+        self.nz = len(self.z)
+        self.mesh = mesh if isinstance(mesh, str) else 'custom'
+        self.h = np.diff(self.z)       # Grid spacings (m)
+        # Grid spacing (m); smallest spacing for a non-uniform mesh
+        self.dz = L / (self.nz - 1) if self.mesh == 'uniform' else self.h.min()
+        # Finite-volume cells around each node (half cells at the surfaces)
+        self.cell_widths = np.concatenate(([self.h[0] / 2], (self.h[:-1] + self.h[1:]) / 2, [self.h[-1] / 2]))
+        # Weights of the thickness averages (thickness_average, oit_avg)
+        self.avg_weights = self.average_weights(self.z, self.mesh)
+        self.Mw0 = Mw0                 # Convert to g/mol (need to check units in the paper)
+        self.dens0 = dens0             # Densité totale du PE (kg/L)
+        self.Xc = Xc           # Fraction cristalline (adimensionnelle)
+        self.densa = densa     # Densité de la phase amorphe (kg/L)
+        self.Tam = 1.0 - self.Xc # Fraction amorphe (volumique ou massique, à clarifier)
+        
+        # Calcul de Tav, si vous l'utilisez explicitement pour modifier les taux de réaction
+        # Assurez-vous que dens0 et densa sont dans les mêmes unités (ex: kg/L)
+        if self.densa > 1e-9: # Eviter division par zéro
+            self.Tav = (self.dens0 / self.densa) * self.Tam
+        else:
+            self.Tav = self.Tam # Approximation si densa n'est pas fournie ou nulle                
+
+        if simulation_mode not in ['pipe', 'film']:
+            raise ValueError("simulation_mode must be 'pipe' or 'film'")
+        self.simulation_mode = simulation_mode
+        print(f"Model initialized in '{self.simulation_mode}' mode with L={self.L:.2e}m, nz={self.nz}"
+              f"{'' if self.mesh == 'uniform' else f' ({self.mesh} mesh, dz from {self.h.min():.2e} to {self.h.max():.2e}m)'}.")
+
+        # --- Mechanical Parameters (Level 3) ---
+        self.A0 = -29.7
+        self.H_plus_m_term = 166725.0
+        self.alpha_m = 3.2
+        self.stress_exp_b = 3.3
+        self.critical_depth_m = 100e-6
+        self.MF_crit = 70.0
+
+        # --- Model Parameters ---
+        self.R_gas = 8.32 # J / (mol K)
+        # Paramètres pour la solubilité du DOC (inspirés du Matlab, à vérifier/affiner)
+        self.S0_DOC = 2.6e-9  # mol/L_amorphe_PE / Pa (Pré-exponentiel solubilité DOC)
+        self.ES_DOC = -2690   # K (Terme -Hs_DOC/R pour solubilité DOC)
+        self.pd0_DOC = 5.7e4  # Pa/ppm (Pré-exponentiel conversion ppm_eau en P_partielle_DOC)
+        self.Ep_DOC = 26440   # J/mol (Terme -E_vap_eff/R pour pression partielle DOC)
+                            # Note: Matlab avait Ep/R en K, donc ici Ep est J/mol
+
+        # --- Rate Coefficients (k_coeffs) ---
+        self.k_coeffs = {
+            'k1d': (0, 2.7e-5), 'k1u': (140e3, 8.0e12), 'k1b': (105e3, 2.8e9),
+            'k2': (0, 1.0e8), 'k3': (73e3, 1.5e10), 'k4':  (0, 8.0e11),   
+            'k4d':  (21.1e3, 6.6e9), 'k5':  (5.9e3, 1.5e12), 'k60':  (80e3, 4.9e19), 
+            'k61': (0, 2e6), 'k62': (5e3, 1.2e6), 'k63': (17.4e3, 4.8e9),
+            'k7': (49.9e3, 1.3e9), 'k8d':  (0, 5.0e-2),
+        }
+
+        # --- Diffusion Coefficients (D_coeffs) at 15°C ---
+        self.D_coeffs = {
+            'O2':   (35e3, 4.3e-5), 'DOC':  (0, 2.0e-11), 'AH':   (115.7e3, 9.1e4),
+        }
+
+        # --- Boundary Coefficients (beta_coeffs) at 15°C ---
+        self.beta_coeffs = {
+            'beta0': (0, 1.9e-9), # Extraction (z=0, water)
+            'betaL': (0, 1.0e-10),# Evaporation (z=L, air - for pipe mode)
+        }
+        
+        if self.simulation_mode == 'film':
+            # For an immersed film, physical loss at z=L is by water extraction,
+            # similar to z=0. We make betaL use beta0's parameters.
+            beta0_Ea, beta0_A = self.beta_coeffs['beta0']
+            self.beta_coeffs['betaL'] = (beta0_Ea, beta0_A) 
+            print(f"  Film mode: beta_coeffs['betaL'] parameters set to beta_coeffs['beta0'] (Ea={beta0_Ea}, A={beta0_A})")
+
+
+        # --- Yields (gamma) ---
+        self.gamma = {
+            'y1s': 1.0, 'y1co': 0.61, 'y4': 0.5, 'y5': 0.0,
+        }
+
+        # --- Stoichiometric / Other Parameters ---
+        self.n_AH = 4      
+        self.PH0_conc = 60.0 
+        self.POOH0_conc = 1.0e-2 
+        self.O2_sat_conc = 3.8e-4 
+        self.AH0_conc = 1.8e-3 # Default initial AH conc for model base material
+        self.DOC_conversion_factor = 1.7e-5 
+        self.ti0_oit = 165.0 # Default initial OIT, can be overridden for specific materials
+
+        # --- Species Indices ---
+        self.species = ['O2', 'DOC', 'AH', 'P', 'PO2', 'POOH', 'PH', 'Q', 'CO', 'PCl', 'S', 'X']
+        self.n_species = len(self.species)
+        self.idx = {name: i for i, name in enumerate(self.species)}
+        # Mobile species (diffusing through the wall)
+        self.mobile_species = ['O2', 'DOC', 'AH']
+        self.mobile_idx = np.array([self.idx[name] for name in self.mobile_species])
+        # Per-species factors of the solver's absolute tolerance (see RADICAL_ATOL_FACTOR)
+        self.atol_scale = np.ones(self.n_species)
+        self.atol_scale[[self.idx['P'], self.idx['PO2']]] = RADICAL_ATOL_FACTOR
+        # Elementary reactions, named after their rate constant in k_coeffs
+        self.reactions = ['k1d', 'k1u', 'k1b', 'k2', 'k3', 'k4', 'k4d', 'k5',
+                          'k60', 'k61', 'k62', 'k63', 'k7', 'k8d']
+        # Reactants of each reaction (mass-action law), used for the analytic Jacobian
+        self.reactants = {
+            'k1d': ('DOC', 'PH'), 'k1u': ('POOH',), 'k1b': ('POOH', 'POOH'),
+            'k2': ('O2', 'P'), 'k3': ('PH', 'PO2'), 'k4': ('P', 'P'),
+            'k4d': ('P', 'DOC'), 'k5': ('P', 'PO2'), 'k60': ('PO2', 'PO2'),
+            'k61': ('Q',), 'k62': ('Q',), 'k63': ('Q',),
+            'k7': ('PO2', 'AH'), 'k8d': ('DOC', 'AH'),
+        }
+
+        self.current_T_K = None
+        self._params_key = None
+        self.k = {}
+        self.D = {}
+        self.beta = {}
+        self.C0 = None # Will be set in simulate
+        self._schedule = None # Time-dependent conditions T(t), DOC_ppm(t) of the running simulation
+        # Opt-in profiling: callable hook(t, elapsed_s) called after each system_equations call
+        self.rhs_timing_hook = None
+
+    @staticmethod
+    def _make_mesh(mesh, L, nz, stretch):
+        """Node positions (m) for a mesh name or an explicit array (see __init__)."""
+        if isinstance(mesh, str):
+            xi = np.linspace(0.0, 1.0, nz)
+            if mesh == 'uniform':
+                return L * xi
+            if mesh == 'surface':
+                z = 0.5 * L * (1.0 + np.tanh(stretch * (2.0 * xi - 1.0)) / np.tanh(stretch))
+                z[0], z[-1] = 0.0, L
+                return z
+            raise ValueError("mesh must be 'uniform', 'surface' or an array of node positions")
+        z = np.asarray(mesh, dtype=float)
+        if z.ndim != 1 or len(z) < 3 or np.any(np.diff(z) <= 0) or not (np.isclose(z[0], 0.0) and np.isclose(z[-1], L)):
+            raise ValueError("mesh nodes must be strictly increasing from 0 to L (at least 3 nodes)")
+        return z
+
+    @staticmethod
+    def average_weights(z, mesh='uniform'):
+        """
+        Weights of the thickness averages for nodes z (m): plain mean on the uniform mesh (as the
+        notebooks), finite-volume cell widths / L otherwise (a plain mean over clustered nodes
+        would overweight the surface layers). Also usable without a model, e.g. for stored results.
+        """
+        z = np.asarray(z, dtype=float)
+        if mesh == 'uniform':
+            return np.full(len(z), 1.0 / len(z))
+        h = np.diff(z)
+        return np.concatenate(([h[0] / 2], (h[:-1] + h[1:]) / 2, [h[-1] / 2])) / (z[-1] - z[0])
+
+    def thickness_average(self, values):
+        """
+        Average over the thickness of values of shape (nz, ...) (e.g. an OIT profile), weighted by
+        avg_weights. Use it instead of np.mean(..., axis=0), which is biased on non-uniform meshes.
+        """
+        return np.tensordot(self.avg_weights, values, axes=(0, 0))
+
+## This function builds a mesh adapted to the fronts of a previous (e.g. coarse) simulation
+    def adapted_mesh(self, sol, nz=None, species=('AH', 'DOC', 'CO'), floor=0.2):
+        """
+        Node positions equidistributing the gradients of a previous solution.
+
+        The monitor function is floor + sum over `species` of |dC/dz| (normalized per species,
+        maximum over the output times), so the nodes follow the fronts seen during the whole
+        run while `floor` keeps a share of them in the bulk of the wall.
+        Use as DegradationModel(L, mesh=model.adapted_mesh(sol, nz=20), ...).
+
+        Args:
+            sol: Successful result of simulate() with this model (sol.y required).
+            nz (int or None): Number of nodes of the new mesh (default: self.nz).
+            species (sequence of str): Species whose fronts are resolved.
+            floor (float): Uniform part of the monitor (relative to the normalized gradients).
+
+        Returns:
+            numpy.ndarray: Node positions (m), from 0 to L.
+        """
+        nz = nz or self.nz
+        C = np.asarray(sol.y).reshape((self.n_species, self.nz, len(sol.t)))
+        monitor = np.full(self.nz - 1, floor)
+        for name in species:
+            grad = np.max(np.abs(np.diff(C[self.idx[name]], axis=0)), axis=1) / self.h
+            if grad.max() > 0:
+                monitor += grad / grad.max()
+        cumulative = np.concatenate(([0.0], np.cumsum(monitor * self.h)))
+        z = np.interp(np.linspace(0.0, cumulative[-1], nz), cumulative, self.z)
+        z[0], z[-1] = 0.0, self.L
+        return z
+
+    def _update_params_for_temp(self, T_kelvin):
+        # Avoid redundant calculations, but recompute if the coefficients were edited since
+        params_key = (T_kelvin, repr(self.k_coeffs), repr(self.D_coeffs), repr(self.beta_coeffs))
+        if T_kelvin == self.current_T_K and params_key == self._params_key:
+            return
+
+        self.current_T_K = T_kelvin
+        self._params_key = params_key
+        self._build_arrhenius_table()
+        values = self._arrhenius_A * np.exp(self._arrhenius_mEa_R / T_kelvin)
+        self.k, self.D, self.beta = {}, {}, {}
+        for (group, name), value in zip(self._arrhenius_names, values):
+            getattr(self, group)[name] = value
+        # Calcul de la solubilité du DOC et du facteur de pression partielle à T_kelvin
+        self.Sd_DOC_T = self.S0_DOC * np.exp(-self.ES_DOC / T_kelvin) # mol/L_amorphe_PE / Pa
+        self.pd_DOC_T = self.pd0_DOC * np.exp(-self.Ep_DOC / (self.R_gas * T_kelvin)) # Pa/ppm_eau
+
+    def _build_arrhenius_table(self):
+        """
+        Flat arrays of the Arrhenius parameters of k_coeffs, D_coeffs and beta_coeffs
+        (A and -Ea/R, Ea <= 0 meaning a constant A), so that all the coefficients are
+        evaluated with a single exp() per temperature. Rebuilt only when the dicts are edited.
+        """
+        key = (repr(self.k_coeffs), repr(self.D_coeffs), repr(self.beta_coeffs))
+        if getattr(self, '_arrhenius_key', None) == key:
+            return
+        groups = [('k', self.k_coeffs), ('D', self.D_coeffs), ('beta', self.beta_coeffs)]
+        self._arrhenius_names = [(group, name) for group, coeffs in groups for name in coeffs]
+        Ea = np.array([coeffs[name][0] for group, coeffs in groups for name in coeffs], dtype=float)
+        self._arrhenius_A = np.array([coeffs[name][1] for group, coeffs in groups for name in coeffs], dtype=float)
+        self._arrhenius_mEa_R = -np.maximum(Ea, 0.0) / self.R_gas
+        # Positions of rate_k, D_mobile and (beta0, betaL) in the flat arrays
+        position = {group_name: i for i, group_name in enumerate(self._arrhenius_names)}
+        self._arrhenius_k_pos = np.array([position['k', name] for name in self.reactions])
+        self._arrhenius_D_pos = np.array([position['D', name] for name in self.mobile_species])
+        self._arrhenius_beta_pos = np.array([position['beta', 'beta0'], position['beta', 'betaL']])
+        self._arrhenius_key = key
+
+    def coefficients_at(self, T_celsius):
+        """
+        Temperature-dependent coefficients, vectorized over temperatures (e.g. to tabulate them).
+
+        Args:
+            T_celsius (float or array-like): Temperature(s) (°C).
+
+        Returns:
+            dict: {'k': {name: value}, 'D': {...}, 'beta': {...}, 'Sd_DOC': value, 'pd_DOC': value},
+                  each value having the shape of T_celsius.
+        """
+        self._build_arrhenius_table()
+        T_kelvin = np.asarray(T_celsius, dtype=float) + 273.15
+        values = self._arrhenius_A.reshape((-1,) + (1,) * T_kelvin.ndim) * \
+            np.exp(np.multiply.outer(self._arrhenius_mEa_R, 1.0 / T_kelvin))
+        table = {'k': {}, 'D': {}, 'beta': {}}
+        for (group, name), value in zip(self._arrhenius_names, values):
+            table[group][name] = value
+        table['Sd_DOC'] = self.S0_DOC * np.exp(-self.ES_DOC / T_kelvin)
+        table['pd_DOC'] = self.pd0_DOC * np.exp(-self.Ep_DOC / (self.R_gas * T_kelvin))
+        return table
+
+    def _set_temperature(self, T_kelvin):
+        """
+        Rate arrays used by system_equations and jacobian at temperature T_kelvin, directly from
+        the Arrhenius table (time-dependent runs: called at every right-hand side evaluation).
+        The dicts are replaced, not modified, since copies of the model may share them.
+        """
+        values = self._arrhenius_A * np.exp(self._arrhenius_mEa_R / T_kelvin)
+        self.rate_k = values[self._arrhenius_k_pos]
+        self.D_mobile = values[self._arrhenius_D_pos]
+        self.D = dict(zip(self.mobile_species, self.D_mobile))
+        self.beta = {'beta0': values[self._arrhenius_beta_pos[0]], 'betaL': values[self._arrhenius_beta_pos[1]]}
+        self.current_T_K = None # self.k no longer matches: recompute in _update_params_for_temp
+
+    def _doc_boundary_at(self, t):
+        """DOC concentration (mol/L of PE) imposed at the water interface at time t (s) of a scheduled run."""
+        schedule = self._schedule
+        t_years = t / (365.25 * 24 * 3600)
+        T_kelvin = (schedule['T'](t_years) if schedule['T'] is not None else schedule['T_celsius']) + 273.15
+        DOC_ppm = schedule['DOC'](t_years) if schedule['DOC'] is not None else schedule['DOC_ppm']
+        if DOC_ppm <= 0:
+            return 0.0
+        Sd_DOC_T = self.S0_DOC * np.exp(-self.ES_DOC / T_kelvin)
+        pd_DOC_T = self.pd0_DOC * np.exp(-self.Ep_DOC / (self.R_gas * T_kelvin))
+        return Sd_DOC_T * pd_DOC_T * DOC_ppm * schedule['DOC_mult'] * self.Tam # Same as in simulate
+
+    def _apply_schedule(self, t):
+        """Coefficients and DOC boundary value (and its derivative) at time t (s) of a scheduled run."""
+        schedule = self._schedule
+        if t == schedule['t']:
+            return
+        schedule['t'] = t
+        if schedule['T'] is not None:
+            self._set_temperature(schedule['T'](t / (365.25 * 24 * 3600)) + 273.15)
+        step = BOUNDARY_DERIVATIVE_STEP_S
+        t_before = max(t - step, 0.0)
+        schedule['boundary'] = self._doc_boundary_at(t)
+        schedule['boundary_rate'] = (self._doc_boundary_at(t + step) - self._doc_boundary_at(t_before)) / (t + step - t_before)
+
+    def parameter_fingerprint(self):
+        """
+        All model settings that affect the result of simulate() (used as cache key).
+
+        Returns:
+            dict: Model class, coefficient dicts, yields, grid, material/boundary parameters, the
+                  parameters of the observables (ti0_oit, Mw0, dens0, critical_depth_m) and the
+                  per-species tolerance factors (atol_scale).
+        """
+        return {
+            'model_class': type(self).__qualname__,
+            'k_coeffs': self.k_coeffs, 'D_coeffs': self.D_coeffs, 'beta_coeffs': self.beta_coeffs,
+            'gamma': self.gamma, 'L': self.L, 'nz': self.nz, 'simulation_mode': self.simulation_mode,
+            'z': self.z if self.mesh != 'uniform' else 'uniform',
+            'R_gas': self.R_gas, 'S0_DOC': self.S0_DOC, 'ES_DOC': self.ES_DOC,
+            'pd0_DOC': self.pd0_DOC, 'Ep_DOC': self.Ep_DOC, 'Xc': self.Xc, 'n_AH': self.n_AH,
+            'PH0_conc': self.PH0_conc, 'POOH0_conc': self.POOH0_conc,
+            'O2_sat_conc': self.O2_sat_conc, 'AH0_conc': self.AH0_conc,
+            'ti0_oit': self.ti0_oit, 'Mw0': self.Mw0, 'dens0': self.dens0, 'densa': self.densa,
+            'critical_depth_m': self.critical_depth_m, 'atol_scale': self.atol_scale,
+        }
+
+    def _build_rate_arrays(self):
+        """
+        Precompute the arrays used by system_equations at the current temperature.
+
+        The 14 elementary reactions are stored as a vector of rate constants
+        (self.rate_k) and a stoichiometric matrix (self.stoich, n_species x n_reactions),
+        so that the chemical source term is simply stoich @ (rate_k * mass-action products).
+        Must be called after _update_params_for_temp and whenever k_coeffs, D_coeffs,
+        beta_coeffs, gamma or n_AH are modified.
+        """
+        k = self.k
+        g = self.gamma
+        n_AH = self.n_AH
+        idx = self.idx
+
+        r = {name: j for j, name in enumerate(self.reactions)}
+        self.rate_k = np.array([k[name] for name in self.reactions])
+
+        S = np.zeros((self.n_species, len(self.reactions)))
+        S[idx['O2'],   [r['k2'], r['k60']]] = [-1, 1]
+        S[idx['DOC'],  [r['k1d'], r['k4d'], r['k8d']]] = [-1, -1, -n_AH]
+        S[idx['AH'],   [r['k8d'], r['k7']]] = [-n_AH, -n_AH]
+        S[idx['P'],    [r['k1d'], r['k1u'], r['k1b'], r['k2'], r['k3'], r['k4'], r['k4d'], r['k5'], r['k63']]] = \
+                       [1, 2, 1, -1, 1, -2, -1, -1, 2]
+        S[idx['PO2'],  [r['k1b'], r['k2'], r['k3'], r['k5'], r['k60'], r['k7']]] = [1, 1, -1, -1, -2, -n_AH]
+        S[idx['POOH'], [r['k1u'], r['k1b'], r['k3'], r['k5']]] = [-1, -2, 1, 1 - g['y5']]
+        S[idx['PH'],   [r['k1d'], r['k1u'], r['k1b'], r['k3'], r['k4'], r['k5'], r['k61'], r['k63']]] = \
+                       [-1, -(2 + g['y1s']), -(1 + g['y1s']), -1, 2 * g['y4'], 3 * g['y5'] - 1, 2, -2 * (1 + g['y1s'])]
+        S[idx['Q'],    [r['k60'], r['k61'], r['k62'], r['k63']]] = [1, -1, -1, -1]
+        S[idx['CO'],   [r['k1u'], r['k1b'], r['k62'], r['k63']]] = [g['y1co'], g['y1co'], 1, 2 * g['y1co']]
+        S[idx['PCl'],  [r['k4d']]] = [1]
+        S[idx['S'],    [r['k1u'], r['k1b'], r['k63']]] = [g['y1s'], g['y1s'], 2 * g['y1s']]
+        S[idx['X'],    [r['k4'], r['k5'], r['k61']]] = [g['y4'], g['y5'], 1]
+        self.stoich = S
+        self.D_mobile = np.array([self.D[name] for name in self.mobile_species])
+        # Finite-volume diffusion weights of node i: flux to i-1 and i+1 divided by the cell width
+        # (both equal to 1/dz**2 on the uniform mesh); zero on the boundary rows
+        self.diff_lower = np.zeros(self.nz)
+        self.diff_upper = np.zeros(self.nz)
+        self.diff_lower[1:-1] = 1.0 / (self.h[:-1] * self.cell_widths[1:-1])
+        self.diff_upper[1:-1] = 1.0 / (self.h[1:] * self.cell_widths[1:-1])
+        # No-flux surface z=L (pipe DOC): flux from node nz-2 over the half cell, 2/dz**2 if uniform
+        self.diff_neumann_L = 1.0 / (self.h[-1] * self.cell_widths[-1])
+
+    def reaction_rates(self, C):
+        """
+        Rates of the 14 elementary reactions at every grid point.
+
+        Args:
+            C (numpy.ndarray): Concentrations, shape (n_species, nz).
+
+        Returns:
+            numpy.ndarray: Reaction rates (mol/L/s), shape (n_reactions, nz),
+                           in the order of self.reactions.
+        """
+        idx = self.idx
+        O2, DOC, AH = C[idx['O2']], C[idx['DOC']], C[idx['AH']]
+        P, PO2, POOH = C[idx['P']], C[idx['PO2']], C[idx['POOH']]
+        PH, Q = C[idx['PH']], C[idx['Q']]
+
+        rates = np.empty((len(self.reactions), C.shape[1]))
+        rates[0] = DOC * PH     # 1d
+        rates[1] = POOH         # 1u
+        rates[2] = POOH * POOH  # 1b
+        rates[3] = O2 * P       # 2
+        rates[4] = PH * PO2     # 3
+        rates[5] = P * P        # 4
+        rates[6] = P * DOC      # 4d
+        rates[7] = P * PO2      # 5
+        rates[8] = PO2 * PO2    # 60
+        rates[9] = Q            # 61
+        rates[10] = Q           # 62
+        rates[11] = Q           # 63
+        rates[12] = PO2 * AH    # 7
+        rates[13] = DOC * AH    # 8d
+        rates *= self.rate_k[:, None]
+        return rates
+
+    def rate_derivatives(self, C, species=None):
+        """
+        Derivatives of the reaction rates with respect to the concentrations (mass-action law).
+
+        Args:
+            C (numpy.ndarray): Concentrations, shape (n_species, nz).
+            species (sequence of int or None): Species indices to differentiate with respect to
+                                               (default: all species).
+
+        Returns:
+            numpy.ndarray: d(rates)/dC, shape (n_reactions, len(species), nz).
+        """
+        species = list(range(self.n_species)) if species is None else list(species)
+        col = {a: b for b, a in enumerate(species)}
+        idx = self.idx
+        drates = np.zeros((len(self.reactions), len(species), C.shape[1]))
+        for j, name in enumerate(self.reactions):
+            reactants = [idx[r] for r in self.reactants[name]]
+            if len(reactants) == 1:
+                if reactants[0] in col:
+                    drates[j, col[reactants[0]]] = 1.0
+            elif reactants[0] == reactants[1]:
+                if reactants[0] in col:
+                    drates[j, col[reactants[0]]] = 2.0 * C[reactants[0]]
+            else:
+                if reactants[0] in col:
+                    drates[j, col[reactants[0]]] += C[reactants[1]]
+                if reactants[1] in col:
+                    drates[j, col[reactants[1]]] += C[reactants[0]]
+        drates *= self.rate_k[:, None, None]
+        return drates
+
+    def system_equations(self, t, y):
+        """
+        Right-hand side dC/dt of the discretized diffusion-reaction system.
+
+        Whole-array version: reactions are evaluated at every node with the
+        precomputed stoichiometric matrix, diffusion of O2, DOC and AH on the
+        interior nodes with slices, then the boundary rows are corrected.
+        If rhs_timing_hook is set, it is called with (t, duration of the call in s).
+        """
+        hook_start = time.perf_counter() if self.rhs_timing_hook is not None else None
+        nz = self.nz
+        idx = self.idx
+        C = y.reshape((self.n_species, nz))
+        if self._schedule is not None:
+            self._apply_schedule(t)
+
+        # --- Reactions (all nodes, including boundaries) ---
+        dCdt = self.stoich @ self.reaction_rates(C)
+
+        # --- Diffusion of mobile species (interior points) ---
+        Cm = C[self.mobile_idx]
+        dCdt[self.mobile_idx, 1:-1] += self.D_mobile[:, None] * (
+            self.diff_upper[1:-1] * (Cm[:, 2:] - Cm[:, 1:-1]) - self.diff_lower[1:-1] * (Cm[:, 1:-1] - Cm[:, :-2]))
+
+        # --- Boundary Conditions ---
+        # === z = 0 (Inner surface, always water interface) ===
+        dCdt[idx['O2'], 0] = 0   # Dirichlet
+        dCdt[idx['DOC'], 0] = 0  # Dirichlet
+        dCdt[idx['AH'], 0] -= self.beta['beta0'] * C[idx['AH'], 0]  # Extraction by water + reactions
+
+        # === z = L (Outer surface) ===
+        dCdt[idx['O2'], -1] = 0  # Fixed C[O2,-1]
+        # AH at z=L: extraction by water (film, betaL = beta0) or evaporation (pipe) + reactions
+        dCdt[idx['AH'], -1] -= self.beta['betaL'] * C[idx['AH'], -1]
+        if self.simulation_mode == 'film':
+            dCdt[idx['DOC'], -1] = 0  # Dirichlet for DOC (value was set in C0)
+        elif self.simulation_mode == 'pipe':
+            # DOC at z=L for pipe: No flux (Neumann) + Reactions
+            DOC = C[idx['DOC']]
+            dCdt[idx['DOC'], -1] += self.D['DOC'] * self.diff_neumann_L * (DOC[-2] - DOC[-1])
+
+        if self._schedule is not None:
+            # Time-dependent Dirichlet value for DOC: follows the schedule (derivative + relaxation)
+            nodes = [0, -1] if self.simulation_mode == 'film' else [0]
+            dCdt[idx['DOC'], nodes] = self._schedule['boundary_rate'] + \
+                (self._schedule['boundary'] - C[idx['DOC'], nodes]) / BOUNDARY_RELAXATION_S
+
+        if hook_start is not None:
+            self.rhs_timing_hook(t, time.perf_counter() - hook_start)
+        return dCdt.ravel()
+
+    def _jacobian_structure(self):
+        """
+        Fixed (row, col) structure of the Jacobian, cached per grid/mode/stoichiometry.
+
+        Local blocks: species a depends on species b at the same node when some
+        reaction r has stoich[a, r] != 0 and b among its reactants.
+        Diffusion adds the O2, DOC and AH couplings to the neighbouring nodes.
+        """
+        key = (self.nz, self.simulation_mode, self.stoich.tobytes())
+        if getattr(self, '_jac_structure_key', None) == key:
+            return self._jac_structure
+
+        nz = self.nz
+        idx = self.idx
+        nodes = np.arange(nz)
+
+        # (a, b) pairs of the local (per node) reaction block
+        depends = np.zeros((self.n_species, self.n_species), dtype=bool)
+        for j, name in enumerate(self.reactions):
+            for species_name in self.reactants[name]:
+                depends[:, idx[species_name]] |= self.stoich[:, j] != 0
+        local_pairs = np.argwhere(depends)
+
+        rows = [a * nz + nodes for a, b in local_pairs]
+        cols = [b * nz + nodes for a, b in local_pairs]
+        # Mobile species: diagonal (for diffusion and boundary fluxes) and neighbours
+        for m in self.mobile_idx:
+            rows += [m * nz + nodes, m * nz + nodes[1:], m * nz + nodes[:-1]]
+            cols += [m * nz + nodes, m * nz + nodes[:-1], m * nz + nodes[1:]]
+        self._jac_structure = (local_pairs, np.concatenate(rows), np.concatenate(cols))
+        self._jac_structure_key = key
+        return self._jac_structure
+
+    def jac_sparsity(self):
+        """
+        Sparsity pattern of the Jacobian of system_equations (for solve_ivp's jac_sparsity).
+
+        Returns:
+            scipy.sparse.csc_matrix: Boolean (n_species*nz, n_species*nz) pattern.
+        """
+        _, rows, cols = self._jacobian_structure()
+        n = self.n_species * self.nz
+        pattern = sparse.csc_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+        pattern.sum_duplicates()
+        return pattern.astype(bool)
+
+    def jacobian(self, t, y):
+        """
+        Analytic Jacobian d(system_equations)/dy in sparse (CSC) form.
+
+        Block structure (species-major ordering, y[a*nz + i] = C[a, i]):
+        12x12 reaction blocks on the node diagonal, plus tridiagonal diffusion
+        blocks for O2, DOC and AH, with the same boundary rows as system_equations.
+        """
+        nz = self.nz
+        idx = self.idx
+        C = y.reshape((self.n_species, nz))
+        if self._schedule is not None:
+            self._apply_schedule(t)
+        local_pairs, rows, cols = self._jacobian_structure()
+
+        # Local blocks stoich @ d(rates)/dC
+        J_local = np.einsum('ar,rbi->abi', self.stoich, self.rate_derivatives(C))
+
+        # Diffusion: interior nodes only, boundary rows handled below
+        D_lower = self.D_mobile[:, None] * self.diff_lower
+        D_upper = self.D_mobile[:, None] * self.diff_upper
+        diag = -(D_lower + D_upper)   # zero on the boundary rows
+        lower = D_lower[:, 1:].copy()   # d(row i)/d(C[i-1]), rows 1..nz-1
+        upper = D_upper[:, :-1].copy()  # d(row i)/d(C[i+1]), rows 0..nz-2
+
+        iDOC = self.mobile_species.index('DOC')
+        iAH = self.mobile_species.index('AH')
+        # AH: Robin flux at both surfaces
+        diag[iAH, 0] = -self.beta['beta0']
+        diag[iAH, -1] = -self.beta['betaL']
+        if self.simulation_mode == 'pipe':
+            # DOC at z=L: no flux (Neumann)
+            diag[iDOC, -1] = -self.D['DOC'] * self.diff_neumann_L
+            lower[iDOC, -1] = self.D['DOC'] * self.diff_neumann_L
+
+        # Dirichlet rows (O2 at both surfaces, DOC at z=0, and at z=L for film) are zero
+        dirichlet = [(idx['O2'], 0), (idx['O2'], nz - 1), (idx['DOC'], 0)]
+        if self.simulation_mode == 'film':
+            dirichlet.append((idx['DOC'], nz - 1))
+        for a, i in dirichlet:
+            J_local[a, :, i] = 0.0
+            m = list(self.mobile_idx).index(a)
+            diag[m, i] = 0.0
+            if i > 0:
+                lower[m, i - 1] = 0.0
+            if i < nz - 1:
+                upper[m, i] = 0.0
+        if self._schedule is not None: # Relaxation of the scheduled DOC boundary value
+            diag[iDOC, 0] = -1.0 / BOUNDARY_RELAXATION_S
+            if self.simulation_mode == 'film':
+                diag[iDOC, -1] = -1.0 / BOUNDARY_RELAXATION_S
+
+        values = [J_local[a, b] for a, b in local_pairs]
+        for m in range(len(self.mobile_idx)):
+            values += [diag[m], lower[m], upper[m]]
+        n = self.n_species * nz
+        return sparse.csc_matrix((np.concatenate(values), (rows, cols)), shape=(n, n))
+
+    def _jac_kwargs(self, method, jacobian):
+        """Jacobian-related keyword arguments of solve_ivp for a given method (see simulate)."""
+        jac_kwargs = {}
+        if method in ('Radau', 'BDF', 'LSODA') and jacobian is not None:
+            if jacobian == 'analytic':
+                # LSODA only accepts dense Jacobians
+                jac_kwargs['jac'] = self.jacobian if method != 'LSODA' else lambda t, y: self.jacobian(t, y).toarray()
+            elif jacobian == 'sparsity' and method != 'LSODA':
+                jac_kwargs['jac_sparsity'] = self.jac_sparsity()
+            elif jacobian != 'sparsity':
+                raise ValueError("jacobian must be 'analytic', 'sparsity' or None")
+        return jac_kwargs
+
+    def _solve_streaming(self, t_span, y0, t_eval, method, rtol, atol, jacobian, on_output, dense_output=False,
+                         stats=None):
+        """
+        Step-by-step equivalent of solve_ivp that hands the outputs to a callback
+        instead of storing them: on_output(t_chunk, y_chunk) is called after each
+        accepted step with the t_eval points it covers (y_chunk: (n, len(t_chunk))).
+        Counters, timings and accepted steps are added to stats (SolverStats) if given.
+
+        Returns:
+            OptimizeResult: status, message, success, nfev/njev/nlu, y_final
+                            (state at the last accepted time) and sol (OdeSolution or None).
+        """
+        fun = self.system_equations
+        if stats is not None:
+            fun = stats.wrap(fun, 'rhs')
+        solver = SOLVER_METHODS[method](fun, t_span[0], y0, t_span[1], rtol=rtol,
+                                        atol=np.repeat(atol * self.atol_scale, self.nz),
+                                        **self._jac_kwargs(method, jacobian))
+        if stats is not None:
+            stats.instrument(solver)
+        i_eval = 0
+        ts, interpolants = [t_span[0]], []
+        status = None
+        while status is None:
+            t_old, h_proposed = solver.t, getattr(solver, 'h_abs', None)
+            message = solver.step()
+            if stats is not None and solver.status != 'failed':
+                stats.record_step(t_old, solver.t, h_proposed, t_span[1])
+            if solver.status == 'finished':
+                status = 0
+            elif solver.status == 'failed':
+                status = -1
+                break
+
+            i_eval_new = np.searchsorted(t_eval, solver.t, side='right')
+            if i_eval_new > i_eval or dense_output:
+                step_output = solver.dense_output()
+                if i_eval_new > i_eval:
+                    t_chunk = t_eval[i_eval:i_eval_new]
+                    on_output(t_chunk, step_output(t_chunk).reshape(len(y0), -1))
+                    i_eval = i_eval_new
+                if dense_output:
+                    ts.append(solver.t)
+                    interpolants.append(step_output)
+
+        if stats is not None:
+            stats.add_counts(solver.nfev, solver.njev, solver.nlu)
+        return OptimizeResult(
+            status=status, success=status >= 0,
+            message=message or "The solver successfully reached the end of the integration interval.",
+            nfev=solver.nfev, njev=solver.njev, nlu=solver.nlu, y_final=solver.y,
+            sol=OdeSolution(ts, interpolants) if dense_output and status == 0 else None,
+        )
+
+    def _output_collector(self, reducers, keep_state, AH0_actual_conc):
+        """
+        Callback for _solve_streaming: keeps the full state and/or applies reducers
+        (see simulate) to each output chunk.
+
+        Returns:
+            tuple: (on_output, finalize) where finalize() returns (t, y, observables).
+        """
+        if reducers is None:
+            funcs = {}
+        elif isinstance(reducers, dict):
+            funcs = dict(reducers)
+        else:
+            funcs = {name: name for name in reducers}
+        for name, reducer in funcs.items():
+            if not callable(reducer):
+                funcs[name] = lambda C, obs=reducer: self._observable(obs, C, AH0_actual_conc)
+
+        t_chunks, y_chunks = [], []
+        reduced_chunks = {name: [] for name in funcs}
+
+        def on_output(t_chunk, y_chunk):
+            t_chunks.append(t_chunk)
+            if keep_state:
+                y_chunks.append(y_chunk)
+            C = y_chunk.reshape((self.n_species, self.nz, len(t_chunk)))
+            for name, func in funcs.items():
+                reduced_chunks[name].append(np.asarray(func(C)))
+
+        def finalize():
+            t = np.concatenate(t_chunks) if t_chunks else np.array([])
+            y = (np.hstack(y_chunks) if y_chunks else np.empty((self.n_species * self.nz, 0))) if keep_state else None
+            observables = {name: np.concatenate(chunks, axis=-1) if chunks else np.array([])
+                           for name, chunks in reduced_chunks.items()}
+            return t, y, observables
+
+        return on_output, finalize
+
+    def _segment_state_error(self, y_chunks, AH0_actual_conc, atol):
+        """
+        Check the states of a segment that the solver reports as successful.
+
+        Args:
+            y_chunks (list of ndarray): States of the segment, shape (n_species*nz, n_times) each.
+            AH0_actual_conc (float): Initial antioxidant concentration (upper bound of AH).
+            atol (numpy.ndarray): Absolute tolerance of each species, shape (n_species,).
+
+        Returns:
+            str or None: Reason to reject the segment (non-finite state, clearly negative species
+                         or AH above its initial value), None if the states are acceptable.
+
+        Only the species consumed exclusively by reactions they take part in (P, PO2, AH, O2...)
+        are checked for sign: PH, for instance, is also consumed by the POOH decompositions and
+        goes negative in the exact solution once the polymer is exhausted (multi-decade runs).
+        """
+        nonnegative = np.array([all(self.species[a] in self.reactants[name]
+                                    for j, name in enumerate(self.reactions) if self.stoich[a, j] < 0)
+                                for a in range(self.n_species)])
+        for y in y_chunks:
+            if not np.all(np.isfinite(y)):
+                return "non-finite state"
+            C = y.reshape((self.n_species, self.nz, -1))
+            scale = np.max(np.abs(C), axis=(1, 2))
+            negative = nonnegative & (np.min(C, axis=(1, 2)) < -(NEGATIVE_TOL * scale + atol))
+            if np.any(negative):
+                return f"negative {self.species[int(np.argmax(negative))]}"
+            AH_max = np.max(C[self.idx['AH']])
+            if AH_max > AH0_actual_conc * (1 + AH_EXCESS_TOL):
+                return f"AH ({AH_max:.3g} mol/L) above its initial value ({AH0_actual_conc:.3g} mol/L)"
+        return None
+
+    def _integrate_with_fallback(self, y0, t_eval, ladder, n_checkpoints, jacobian, dense_output, on_output,
+                                 AH0_actual_conc, stats=None):
+        """
+        Integrate segment by segment between regularly spaced checkpoints.
+
+        Each segment starts with the first (tightest) settings of the ladder; if it fails, or
+        if its states are unphysical (see _segment_state_error), the next settings are tried
+        from the segment start (last accepted checkpoint). Outputs of a segment are passed to
+        on_output only once the segment is accepted.
+
+        Returns:
+            OptimizeResult: status, message, success, nfev/njev/nlu, sol (merged dense output)
+                            and 'segments' (list of dicts: t_start_years, t_end_years, method,
+                            rtol, atol, attempts).
+        """
+        year_sec = 365.25 * 24 * 3600
+        checkpoints = np.linspace(t_eval[0], t_eval[-1], max(1, n_checkpoints) + 1)
+        y_start = y0
+        ts, interpolants, segments = [], [], []
+        nfev = njev = nlu = 0
+        status, message = 0, "The solver successfully reached the end of the integration interval."
+
+        on_output(t_eval[:1], y0[:, None])
+        for t_a, t_b in zip(checkpoints[:-1], checkpoints[1:]):
+            seg_eval = t_eval[(t_eval > t_a) & (t_eval <= t_b)]
+
+            for attempt, params in enumerate(ladder, start=1):
+                print(f"  Segment [{t_a / year_sec:.3g}, {t_b / year_sec:.3g}] years - "
+                      f"Solver: {params['method']}, rtol={params['rtol']:.1e}, atol={params['atol']:.1e}")
+                seg_outputs = []
+                seg_sol = self._solve_streaming(
+                    (t_a, t_b), y_start, seg_eval, params['method'], params['rtol'], params['atol'],
+                    jacobian, lambda t_chunk, y_chunk: seg_outputs.append((t_chunk, y_chunk)), dense_output, stats
+                )
+                nfev += seg_sol.nfev
+                njev += seg_sol.njev
+                nlu += seg_sol.nlu
+                if seg_sol.success:
+                    reason = self._segment_state_error([y_chunk for _, y_chunk in seg_outputs] +
+                                                       [seg_sol.y_final[:, None]], AH0_actual_conc,
+                                                       params['atol'] * self.atol_scale)
+                    if reason is None:
+                        break
+                    reason = f"unphysical state, {reason}"
+                else:
+                    reason = seg_sol.message
+                print(f"    Segment FAILED: {reason}")
+            else:
+                status, message = -1, f"All fallback settings failed after t={t_a / year_sec:.4g} years: {reason}"
+                break
+
+            segments.append({'t_start_years': float(t_a / year_sec), 't_end_years': float(t_b / year_sec),
+                             'method': params['method'], 'rtol': params['rtol'], 'atol': params['atol'],
+                             'attempts': attempt})
+            for t_chunk, y_chunk in seg_outputs:
+                on_output(t_chunk, y_chunk)
+            y_start = seg_sol.y_final
+            if dense_output:
+                ts.append(seg_sol.sol.ts if not ts else seg_sol.sol.ts[1:])
+                interpolants.extend(seg_sol.sol.interpolants)
+
+        return OptimizeResult(
+            sol=OdeSolution(np.concatenate(ts), interpolants) if dense_output and status == 0 else None,
+            t_events=None, y_events=None,
+            nfev=nfev, njev=njev, nlu=nlu,
+            status=status, message=message, success=status >= 0,
+            segments=segments,
+        )
+
+## This function runs the simulation for given conditions
+    def simulate(self, T_celsius, DOC_ppm, t_end_years, n_timepoints=100, 
+                 O2_sat_mult=1.0, AH0_mult=1.0, POOH0_mult=1.0, DOC_mult=1.0,
+                 method='Radau', rtol=1e-4, atol=1e-7, jacobian='analytic', dense_output=False,
+                 fallback=None, n_checkpoints=10, reducers=None, keep_state=True, cache=None):
+        """
+        Run the diffusion-reaction simulation for given conditions.
+
+        Args:
+            T_celsius (float or callable): Temperature (°C), or a schedule T(t_years), e.g.
+                schedules.Schedule.seasonal(mean=12, amplitude=6) (yearly profile repeated).
+                Rate constants, diffusivities and beta then follow T(t) (one vectorized
+                Arrhenius evaluation per right-hand side call, see coefficients_at).
+            DOC_ppm (float or callable): DOC concentration in water (ppm), or a schedule DOC_ppm(t_years).
+                With schedules, the DOC boundary value follows Sd_DOC(T) * pd_DOC(T) * DOC_ppm(t)
+                (relaxation time BOUNDARY_RELAXATION_S); use an implicit method (Radau, BDF, LSODA).
+                Use schedules.Schedule rather than plain functions so that cache keys are stable.
+            rtol, atol (float): Solver tolerances. The absolute tolerance of the radicals P and PO2
+                is atol * RADICAL_ATOL_FACTOR (atol_scale), that of the other species atol.
+            jacobian (str or None): Jacobian given to the implicit solvers (Radau, BDF, LSODA):
+                'analytic' (sparse analytic Jacobian, default), 'sparsity' (finite differences
+                restricted to the sparsity pattern) or None (dense finite differences, as the
+                original notebook class; slow on fine grids). The results agree with the notebook
+                class on Fig. 3d and Fig. 4 at nz=100 (benchmarks/check_regression.py).
+            dense_output (bool): Keep the continuous solution (sol.sol) so that the state can be
+                evaluated at any time of [0, t_end] afterwards (see observe).
+            fallback (list of dict, bool or None): Solver ladder, e.g.
+                [{'method': 'Radau', 'rtol': 1e-4, 'atol': 1e-7}, {'method': 'BDF', ...}, ...].
+                The run is split into n_checkpoints segments; when a segment fails, it is retried
+                with the next settings from the last checkpoint (not from t=0). True uses
+                (method, rtol, atol) followed by DEFAULT_FALLBACK. None or False: single integration.
+                Successful segments with unphysical states (non-finite, clearly negative species,
+                AH above AH0 * AH0_mult) are also retried with the next settings.
+            n_checkpoints (int): Number of segments (checkpoints) used with fallback.
+            reducers (sequence or dict or None): Observables computed on each output step while
+                integrating, returned as small time series in sol.observables. Either names accepted
+                by observe() (e.g. ['oit_avg', 'co_surface', 'mw_proxy']) or a dict
+                {name: observable name or callable f(C) with C of shape (n_species, nz, nt_chunk)}.
+            keep_state (bool): Also store the full state in sol.y. With reducers and
+                keep_state=False, sol.y is None and only the time series are kept in memory.
+            cache (simulation_cache.SimulationCache or None): On-disk cache. The key covers
+                parameter_fingerprint() and all the arguments above; successful runs are stored.
+                Runs with inputs lacking a stable representation (plain-function schedules,
+                callable reducers) are not cached.
+
+        Returns:
+            OptimizeResult: t, y, sol, observables, success, message, nfev/njev/nlu, sim_params and
+            stats (SolverStats.as_dict(): step counts and sizes, a lower bound of the rejected steps,
+            wall time split between right-hand side, Jacobian and linear algebra; see format_stats).
+        """
+        if fallback is False:
+            fallback = None
+        if cache is not None:
+            try:
+                cache_key = cache.make_key(self.parameter_fingerprint(), {
+                    'T_celsius': T_celsius, 'DOC_ppm': DOC_ppm, 't_end_years': t_end_years,
+                    'n_timepoints': n_timepoints, 'O2_sat_mult': O2_sat_mult, 'AH0_mult': AH0_mult,
+                    'POOH0_mult': POOH0_mult, 'DOC_mult': DOC_mult, 'method': method, 'rtol': rtol,
+                    'atol': atol, 'jacobian': jacobian, 'dense_output': dense_output,
+                    'fallback': fallback, 'n_checkpoints': n_checkpoints if fallback is not None else None,
+                    'reducers': reducers, 'keep_state': keep_state,
+                })
+            except UncacheableError as e: # Plain-function schedule, callable reducer...
+                print(f"Simulation not cached: {e}")
+                cache = None
+        if cache is not None:
+            sol = cache.get(cache_key)
+            if sol is not None:
+                print(f"Simulation loaded from cache: T={T_celsius}°C, DOC={DOC_ppm} ppm, "
+                      f"Time={t_end_years:.3f} years, Mode='{self.simulation_mode}' (key {cache_key[:12]})")
+                return sol
+
+        # Time-dependent conditions: initial values here, then updated at each solver call
+        T_schedule = T_celsius if callable(T_celsius) else None
+        DOC_schedule = DOC_ppm if callable(DOC_ppm) else None
+        T0_celsius = float(T_schedule(0.0)) if T_schedule is not None else T_celsius
+        DOC0_ppm = float(DOC_schedule(0.0)) if DOC_schedule is not None else DOC_ppm
+
+        T_kelvin = T0_celsius + 273.15
+        self._schedule = None
+        self._update_params_for_temp(T_kelvin) 
+        self._build_rate_arrays()
+
+        O2_boundary_conc = self.O2_sat_conc * O2_sat_mult
+        AH0_actual_conc = self.AH0_conc * AH0_mult
+        POOH0_actual_conc = self.POOH0_conc * POOH0_mult
+        # DOC_boundary_conc = DOC_ppm * self.DOC_conversion_factor * DOC_mult if DOC_ppm > 0 else 0.0 # ANCIENNE LIGNE
+        if DOC0_ppm > 0:
+            # Concentration d'équilibre du DOC dans la phase amorphe du PE (mol/L_amorphe_PE)
+            doc_conc_amorphous_phase = self.Sd_DOC_T * self.pd_DOC_T * DOC0_ppm * DOC_mult
+            
+            # Si vos équations et constantes k sont pour des concentrations par volume TOTAL de PE:
+            # On convertit la concentration dans la phase amorphe en concentration par volume total de PE
+            # en multipliant par la fraction volumique amorphe accessible (Tam ou Tav).
+            # Utilisons Tam = (1-Xc) comme approximation de la fraction volumique amorphe.
+            DOC_boundary_conc = doc_conc_amorphous_phase * self.Tam 
+            # Alternativement, si les 'k' sont pour des réactions en phase amorphe avec des conc. amorphes,
+            # alors DOC_boundary_conc pourrait être doc_conc_amorphous_phase,
+            # et les termes de réaction impliquant PH devraient utiliser PH_amorphe = PH0_conc / Tam.
+            # Pour l'instant, cette approche rend DOC_boundary_conc équivalent à [mol_DOC / L_PE_total].
+        else:
+            DOC_boundary_conc = 0.0
+
+        y0_flat = np.zeros(self.n_species * self.nz) # Keep as flat for direct use by solver
+        C0 = y0_flat.reshape((self.n_species, self.nz)) # Temporary view for easy C0 setup
+
+        C0[self.idx['O2'], :]   = O2_boundary_conc # Uniform O2 initially, including boundaries
+        C0[self.idx['DOC'], :]  = 0.0              # DOC starts at 0 in bulk
+        C0[self.idx['AH'], :]   = AH0_actual_conc 
+        C0[self.idx['POOH'], :] = POOH0_actual_conc 
+        C0[self.idx['PH'], :]   = self.PH0_conc   
+        C0[self.idx['P'], :]    = 0.0  
+        C0[self.idx['PO2'], :]  = 0.0  
+        C0[self.idx['Q'], :]    = 0.0  
+        C0[self.idx['CO'], :]   = 0.0  
+        C0[self.idx['PCl'], :]  = 0.0  
+        C0[self.idx['S'], :]    = 0.0  
+        C0[self.idx['X'], :]    = 0.0  
+
+        # Set specific boundary concentrations in C0 for Dirichlet conditions
+        C0[self.idx['O2'], 0]   = O2_boundary_conc
+        C0[self.idx['O2'], -1]  = O2_boundary_conc
+        C0[self.idx['DOC'], 0]  = DOC_boundary_conc
+        C0[self.idx['AH'], -1]   = AH0_actual_conc*(1-0.25) # OSL [AH]
+        
+        if self.simulation_mode == 'film':
+            C0[self.idx['DOC'], -1] = DOC_boundary_conc 
+            print(f"  FILM MODE: Initial C0[DOC, L] set to {DOC_boundary_conc:.2e}")
+        # For pipe mode, C0[DOC, -1] remains the bulk initial value (0.0)
+        # as its BC in system_equations is Neumann+Reaction
+
+        self.C0 = C0.copy() # Store the fully prepared C0 if needed for reference
+        y0 = C0.flatten() # Use the already flattened y0_flat which C0 was a view of
+
+        t_start_sec = 0
+        t_end_sec = t_end_years * 365.25 * 24 * 3600
+        t_span = (t_start_sec, t_end_sec)
+        # Ensure t_eval has at least 2 points if t_end_sec > t_start_sec for solve_ivp
+        if np.isclose(t_start_sec, t_end_sec):
+            actual_n_timepoints = 1 if n_timepoints >=1 else n_timepoints # Can be 1 for t=0
+        else:
+            actual_n_timepoints = max(2, n_timepoints)
+        t_eval = np.linspace(t_start_sec, t_end_sec, actual_n_timepoints)
+
+
+        print(f"Running simulation: T={T_celsius}°C, DOC={DOC_ppm} ppm, Time={t_end_years:.3f} years, Mode='{self.simulation_mode}'")
+        start_time = time.time()
+        if T_schedule is not None or DOC_schedule is not None:
+            self._schedule = {'T': T_schedule, 'DOC': DOC_schedule, 'T_celsius': T_celsius, 'DOC_ppm': DOC_ppm,
+                              'DOC_mult': DOC_mult, 't': None}
+            print(f"  Time-dependent conditions: T(0)={T0_celsius:.4g}°C, DOC(0)={DOC0_ppm:.4g} ppm")
+        stats = SolverStats()
+        on_output, finalize = self._output_collector(reducers, keep_state, AH0_actual_conc)
+        if fallback is None:
+            # Same steps and outputs as solve_ivp, with the solver statistics
+            print(f"  Solver: {method}, rtol={rtol:.1e}, atol={atol:.1e}")
+            sol = self._solve_streaming(t_span, y0, t_eval, method, rtol, atol, jacobian, on_output,
+                                        dense_output, stats)
+            del sol['y_final']
+        else:
+            if fallback is True:
+                ladder = [{'method': method, 'rtol': rtol, 'atol': atol}] + \
+                         [p for p in DEFAULT_FALLBACK if (p['method'], p['rtol'], p['atol']) != (method, rtol, atol)]
+            else:
+                ladder = list(fallback)
+            sol = self._integrate_with_fallback(y0, t_eval, ladder, n_checkpoints, jacobian, dense_output,
+                                                on_output, AH0_actual_conc, stats)
+            if sol.segments: # Report the loosest settings actually used
+                loosest = max(sol.segments, key=lambda seg: (seg['rtol'], seg['atol']))
+                method, rtol, atol = loosest['method'], loosest['rtol'], loosest['atol']
+        sol.t, sol.y, sol.observables = finalize()
+        sol.t_events = sol.y_events = None
+        if self._schedule is not None: # Back to the initial conditions for direct calls of system_equations
+            self._schedule = None
+            self._update_params_for_temp(T_kelvin)
+            self._build_rate_arrays()
+        end_time = time.time()
+        stats.wall_time_s = end_time - start_time
+        sol.stats = stats.as_dict()
+        print(f"Simulation duration: {end_time - start_time:.2f} seconds")
+        print(f"  Solver stats: {format_stats(sol.stats)}")
+
+        if not sol.success:
+            print(f"Simulation FAILED: {sol.message}")
+        else:
+            print("Simulation successful.")
+            sol.sim_params = {
+                'T_celsius': T_celsius, 'DOC_ppm': DOC_ppm, 't_end_years': t_end_years,
+                'AH0_conc_used': AH0_actual_conc, 'POOH0_conc_used': POOH0_actual_conc,
+                'O2_sat_conc_used': O2_boundary_conc, 'simulation_mode': self.simulation_mode,
+                'rtol_used': rtol, 'atol_used': atol, 'method_used': method,
+                'jacobian_used': jacobian, 'mesh': self.mesh
+            }
+            if fallback is not None:
+                sol.sim_params['segments'] = sol.segments
+        if cache is not None and sol.success:
+            cache.put(cache_key, sol)
+        return sol
+
+## This function runs a single simulation and evaluates observables at arbitrary times
+    def simulate_at(self, T_celsius, DOC_ppm, times_years, observables=('oit_avg', 'co_surface'), **simulate_kwargs):
+        """
+        Run ONE integration up to max(times_years) with dense output and evaluate
+        observables at every requested time (no restart from t=0 per time point).
+
+        Args:
+            T_celsius (float or callable): Temperature (°C) or schedule T(t_years) (see simulate).
+            DOC_ppm (float or callable): DOC concentration in water (ppm) or schedule (see simulate).
+            times_years (array-like): Observation times (years), need not be on the t_eval grid.
+            observables (sequence of str): Names accepted by observe().
+            **simulate_kwargs: Passed to simulate() (n_timepoints, AH0_mult, method, rtol, ...).
+
+        Returns:
+            tuple: (sol, results). sol keeps its dense output, so later queries at other times
+                   can be made with observe(sol, ...). results is the dict returned by observe(),
+                   or None if the simulation failed.
+        """
+        times_years = np.atleast_1d(np.asarray(times_years, dtype=float))
+        if times_years.max() <= 0:
+            raise ValueError("times_years must contain at least one strictly positive time")
+
+        sol = self.simulate(T_celsius, DOC_ppm, t_end_years=times_years.max(),
+                            dense_output=True, **simulate_kwargs)
+        if not sol.success:
+            return sol, None
+        return sol, self.observe(sol, times_years, observables)
+
+## This function evaluates observables (OIT, surface CO, profiles...) from a dense-output solution
+    def observe(self, sol, times_years, observables=('oit_avg', 'co_surface')):
+        """
+        Evaluate observables of a dense-output solution at arbitrary times.
+
+        Available observables:
+            'state'       : concentrations, shape (n_species, nz, nt)
+            'oit_profile' : OIT (min) vs depth, shape (nz, nt)
+            'oit_avg'     : OIT averaged over the thickness (min), shape (nt,)
+            'co_surface'  : [CO] at z=0 (mol/L), shape (nt,)
+            'co_profile'  : [CO] vs depth, shape (nz, nt)
+            'mw_profile'  : Mw (kg/mol) vs depth from Saito's equation, shape (nz, nt)
+            'mw_proxy'    : Mw (kg/mol) at the critical depth critical_depth_m, shape (nt,)
+            any species name (e.g. 'AH') : profile vs depth, shape (nz, nt)
+
+        Args:
+            sol: Solution returned by simulate(..., dense_output=True) or simulate_at().
+            times_years (array-like): Times (years) within [0, t_end_years] of the run.
+            observables (sequence of str): Observables to return.
+
+        Returns:
+            dict: {'t_years': times, <observable>: array, ...}
+        """
+        if getattr(sol, 'sol', None) is None:
+            raise ValueError("Solution has no dense output: use simulate(..., dense_output=True) or simulate_at()")
+
+        times_years = np.atleast_1d(np.asarray(times_years, dtype=float))
+        times_sec = times_years * 365.25 * 24 * 3600
+        if np.any(times_sec < sol.t[0]) or np.any(times_sec > sol.t[-1] * (1 + 1e-12)):
+            raise ValueError(f"Observation times must lie within [0, {sol.t[-1] / (365.25 * 24 * 3600):.4g}] years")
+
+        C = sol.sol(np.clip(times_sec, sol.t[0], sol.t[-1])).reshape((self.n_species, self.nz, len(times_sec)))
+        AH0_actual_conc = getattr(sol, 'sim_params', {}).get('AH0_conc_used', self.AH0_conc)
+
+        results = {'t_years': times_years}
+        for name in observables:
+            results[name] = self._observable(name, C, AH0_actual_conc)
+        return results
+
+    def _observable(self, name, C, AH0_actual_conc):
+        """
+        Observable `name` (see observe) from concentrations C of shape (n_species, nz, nt).
+        """
+        if name == 'state':
+            return C
+        elif name == 'oit_profile':
+            return self.calculate_oit(C[self.idx['AH']], AH0_actual_conc)
+        elif name == 'oit_avg':
+            return self.thickness_average(self.calculate_oit(C[self.idx['AH']], AH0_actual_conc))
+        elif name == 'co_surface':
+            return C[self.idx['CO'], 0]
+        elif name == 'co_profile':
+            return C[self.idx['CO']]
+        elif name in ('mw_profile', 'mw_proxy'):
+            # Saito's equation (Eq 14, Paper [3]), S and X converted to mol/kg
+            inv_mw = 1.0 / self.Mw0 + (C[self.idx['S']] / 2.0 - 2.0 * C[self.idx['X']]) / self.dens0
+            mw = np.where(inv_mw > 1e-12, 1.0 / np.maximum(inv_mw, 1e-12), np.nan)
+            if name == 'mw_profile':
+                return mw
+            # Mw at the critical depth (linear interpolation between grid points)
+            i = np.clip(np.searchsorted(self.z, self.critical_depth_m), 1, self.nz - 1)
+            w = np.clip((self.critical_depth_m - self.z[i - 1]) / (self.z[i] - self.z[i - 1]), 0.0, 1.0)
+            return (1 - w) * mw[i - 1] + w * mw[i]
+        elif name in self.idx:
+            return C[self.idx[name]]
+        else:
+            raise ValueError(f"Unknown observable '{name}'")
+
+## This function calculates the Oxidation Induction Time (OIT) based on the antioxidant profile
+## AVEC CORRECTION 
+    def calculate_oit(self, AH_profile, AH0_actual_conc):
+        """
+        Calculate Oxidation Induction Time (OIT) from AH profile.
+
+        Args:
+            AH_profile (numpy.ndarray): Array of current antioxidant (AH) concentrations
+                                        at different spatial points (or over time at one point).
+            AH0_actual_conc (float): The initial antioxidant (AH) concentration that
+                                     AH_profile should be compared against for this specific
+                                     simulation run or material.
+
+        Returns:
+            numpy.ndarray: Array of OIT values (min) corresponding to AH_profile.
+        """
+        # Using Eq (1) from Part II [2], relative to the *initial* AH concentration used
+        # OIT(t) = ti0 * ([AH](t) / [AH]0)
+        # self.ti0_oit should be set appropriately for the material being simulated
+        # (e.g., 165 min for Sample A in Paper [2])
+
+        # Protect against division by zero if AH0_actual_conc is zero or negative
+        if AH0_actual_conc <= 1e-12: # Using a small threshold instead of direct zero check
+            # If initial AH is effectively zero, OIT is also zero
+            return np.zeros_like(AH_profile) 
+
+        # Calculate the ratio, ensuring AH_profile values are not negative
+        # (though they shouldn't be if the ODEs are well-behaved)
+        ah_ratio = np.maximum(0 , AH_profile) / AH0_actual_conc
+        
+        oit = self.ti0_oit * ah_ratio
+        
+        # OIT cannot be negative, and practically, should not exceed initial OIT significantly
+        # if AH_profile cannot exceed AH0_actual_conc.
+        # Clamping OIT values to be non-negative.
+        #oit = np.maximum(0, oit)
+        
+        # Optional: If you want to strictly ensure OIT doesn't exceed ti0_oit
+        # (e.g., if AH_profile due to some numerical artifact slightly exceeds AH0_actual_conc)
+        # oit = np.minimum(oit, self.ti0_oit) # This would cap OIT at its initial value
+
+        return oit
+## SANS CORRECTION
+    def calculate_oit_sans_correction(self, AH_profile, AH0_actual_conc):
+        """
+        Calculate Oxidation Induction Time (OIT) from AH profile.
+
+        Args:
+            AH_profile (numpy.ndarray): Array of current antioxidant (AH) concentrations
+                                        at different spatial points (or over time at one point).
+            AH0_actual_conc (float): The initial antioxidant (AH) concentration that
+                                     AH_profile should be compared against for this specific
+                                     simulation run or material.
+
+        Returns:
+            numpy.ndarray: Array of OIT values (min) corresponding to AH_profile.
+        """
+        # Using Eq (1) from Part II [2], relative to the *initial* AH concentration used
+        # OIT(t) = ti0 * ([AH](t) / [AH]0)
+        # self.ti0_oit should be set appropriately for the material being simulated
+        # (e.g., 165 min for Sample A in Paper [2])
+
+        # Protect against division by zero if AH0_actual_conc is zero or negative
+        if AH0_actual_conc <= 1e-12: # Using a small threshold instead of direct zero check
+            # If initial AH is effectively zero, OIT is also zero
+            return np.zeros_like(AH_profile) 
+
+        # Calculate the ratio, ensuring AH_profile values are not negative
+        # (though they shouldn't be if the ODEs are well-behaved)
+        ah_ratio = AH_profile / AH0_actual_conc
+        
+        oit = self.ti0_oit * ah_ratio
+        
+        # OIT cannot be negative, and practically, should not exceed initial OIT significantly
+        # if AH_profile cannot exceed AH0_actual_conc.
+        # Clamping OIT values to be non-negative.
+        #oit = np.maximum(0, oit)
+        
+        # Optional: If you want to strictly ensure OIT doesn't exceed ti0_oit
+        # (e.g., if AH_profile due to some numerical artifact slightly exceeds AH0_actual_conc)
+        # oit = np.minimum(oit, self.ti0_oit) # This would cap OIT at its initial value
+
+        return oit
@@ -0,0 +1,294 @@
+## This module contains a network-scale batch mode of DegradationModel: remaining lifetime of many
+## pipe segments described in a CSV/Parquet file (wall thickness, water temperature, disinfectant
+## residual, possibly decaying along the network with the water age).
+##
+## Segments sharing the same grid geometry (L, nz, simulation_mode) are run on one model per batch,
+## so the model setup, the Arrhenius table and the structure of the analytic Jacobian (jacobian='analytic',
+## set explicitly in run_batch) are built once per batch.
+## Batches run in a process pool with a bounded number of batches in flight, and only the Mw/OIT time
+## series are kept per segment (keep_state=False), so the memory stays bounded for any network size.
+##
+## Input columns (one row per segment):
+##     segment_id                      identifier (any type)
+##     L (m) or thickness_mm           wall thickness
+##     T_celsius                       mean water temperature
+##     DOC_ppm                         disinfectant residual at the segment, or
+##     DOC_source_ppm, water_age_h     residual leaving the plant and water age at the segment
+##                                     (first-order bulk decay, rate column decay_rate_per_h or argument)
+##     optional: age_years (in service, default 0), AH0_mult (default 1), T_amplitude (seasonal
+##               half-amplitude, °C), nz, simulation_mode
+##
+## Usage:
+##     table = run_network("segments.csv", output="remaining_lifetime.csv", horizon_years=100,
+##                         n_workers=8, decay_rate_per_h=0.02)
+##     python network_batch.py segments.parquet remaining_lifetime.csv --workers 8
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from degradation_model import DegradationModel, lifetime_years
+from schedules import Schedule
+from simulation_cache import SimulationCache
+
+# Columns defining the grid geometry: segments sharing them are run on the same model
+GEOMETRY_KEYS = ('L', 'nz', 'simulation_mode')
+RESULT_COLUMNS = ('rank', 'segment_id', 'remaining_years', 'lifetime_years', 'age_years', 'L', 'T_celsius',
+                  'DOC_ppm', 'AH0_mult', 'oit_end_min', 'mw_end', 'status', 'message', 'wall_time_s')
+
+
+def read_segments(path):
+    """Segment table from a .csv or .parquet file (Parquet needs pyarrow or fastparquet)."""
+    if os.path.splitext(path)[1].lower() in ('.parquet', '.pq'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def write_table(table, path):
+    """Write a table as .parquet or .csv according to the file extension."""
+    if os.path.splitext(path)[1].lower() in ('.parquet', '.pq'):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
+
+
+def residual_along_network(DOC_source_ppm, water_age_h, decay_rate_per_h):
+    """
+    Disinfectant residual after first-order bulk decay: DOC = DOC_source * exp(-k_b * age).
+
+    Args:
+        DOC_source_ppm (float or array-like): Residual leaving the treatment plant (ppm).
+        water_age_h (float or array-like): Travel time of the water to the segment (hours).
+        decay_rate_per_h (float or array-like): Bulk decay constant k_b (1/h).
+    """
+    return np.asarray(DOC_source_ppm, dtype=float) * np.exp(-np.asarray(decay_rate_per_h, dtype=float) *
+                                                            np.asarray(water_age_h, dtype=float))
+
+
+def prepare_segments(segments, decay_rate_per_h=None, nz=25, simulation_mode='pipe'):
+    """
+    Normalize a segment table to the columns used by run_network (see module header).
+
+    Args:
+        segments (pandas.DataFrame): Segment descriptions.
+        decay_rate_per_h (float or None): Bulk decay constant used when DOC_ppm is not given
+                                          and there is no decay_rate_per_h column.
+        nz (int): Grid size of the segments without a nz column.
+        simulation_mode (str): Mode of the segments without a simulation_mode column.
+
+    Returns:
+        pandas.DataFrame: Copy with L (m), DOC_ppm, age_years, AH0_mult, T_amplitude, nz, simulation_mode.
+    """
+    table = segments.copy()
+    missing = [name for name in ('segment_id', 'T_celsius') if name not in table]
+    if missing:
+        raise ValueError(f"Missing segment columns: {missing}")
+    if table['segment_id'].duplicated().any():
+        raise ValueError("segment_id values must be unique")
+
+    if 'L' not in table:
+        if 'thickness_mm' not in table:
+            raise ValueError("The wall thickness is needed: column L (m) or thickness_mm")
+        table['L'] = table['thickness_mm'] / 1000.0
+    if 'DOC_ppm' not in table:
+        if 'DOC_source_ppm' not in table or 'water_age_h' not in table:
+            raise ValueError("The residual is needed: column DOC_ppm, or DOC_source_ppm and water_age_h")
+        if 'decay_rate_per_h' in table:
+            rate = table['decay_rate_per_h'].fillna(decay_rate_per_h if decay_rate_per_h is not None else np.nan)
+        else:
+            rate = decay_rate_per_h
+        if rate is None or np.any(np.isnan(np.asarray(rate, dtype=float))):
+            raise ValueError("A bulk decay rate is needed: column decay_rate_per_h or decay_rate_per_h=...")
+        table['DOC_ppm'] = residual_along_network(table['DOC_source_ppm'], table['water_age_h'], rate)
+
+    for name, default in (('age_years', 0.0), ('AH0_mult', 1.0), ('T_amplitude', 0.0), ('nz', nz),
+                          ('simulation_mode', simulation_mode)):
+        table[name] = table[name].fillna(default) if name in table else default
+    table['nz'] = table['nz'].astype(int)
+    return table
+
+
+def _run_segment(model, segment, horizon_years, n_timepoints, run_args):
+    """Lifetime of one segment on an already built model (never raises)."""
+    start = time.time()
+    result = {'segment_id': segment['segment_id']}
+    T_celsius = segment['T_celsius']
+    if segment['T_amplitude']:
+        T_celsius = Schedule.seasonal(mean=T_celsius, amplitude=segment['T_amplitude'])
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            sol = model.simulate(T_celsius, segment['DOC_ppm'], horizon_years, n_timepoints=n_timepoints,
+                                 AH0_mult=segment['AH0_mult'], reducers=('oit_avg', 'mw_proxy'),
+                                 keep_state=False, **run_args)
+        mw = sol.observables['mw_proxy']
+        life = np.nan
+        if len(sol.t) >= 2:
+            life = lifetime_years(sol.t / (365.25 * 24 * 3600), mw, model.MF_crit)
+        if not sol.success and np.isinf(life): # MF_crit not reached before the solver failure: unknown
+            life = np.nan
+        result.update(status='ok' if sol.success else 'failed', message=sol.message, lifetime_years=life,
+                      oit_end_min=sol.observables['oit_avg'][-1] if len(sol.t) else np.nan,
+                      mw_end=mw[-1] if len(sol.t) else np.nan)
+    except Exception as e:
+        result.update(status='failed', message=f"{type(e).__name__}: {e}", lifetime_years=np.nan)
+    result['wall_time_s'] = time.time() - start
+    return result
+
+
+def run_batch(model_args, segments, horizon_years, n_timepoints=201, model_attributes=None,
+              simulate_kwargs=None, cache_dir=None):
+    """
+    Run segments sharing one grid geometry on a single model (setup and Jacobian structure reused).
+
+    Args:
+        model_args (dict): DegradationModel arguments (L, nz, simulation_mode).
+        segments (list of dict): Rows of prepare_segments().
+        horizon_years (float): Simulated duration; lifetimes beyond it are inf.
+        n_timepoints (int): Output times of Mw (the lifetime is interpolated between them).
+        model_attributes (dict or None): Attributes set on the model after construction.
+        simulate_kwargs (dict or None): simulate() arguments (default: fallback=True, jacobian='analytic').
+        cache_dir (str or None): SimulationCache directory shared by the workers.
+
+    Returns:
+        list of dict: One result per segment (segment_id, status, message, lifetime_years,
+                      oit_end_min, mw_end, wall_time_s).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = DegradationModel(**model_args)
+    for name, value in (model_attributes or {}).items():
+        setattr(model, name, value)
+    run_args = {'fallback': True, 'jacobian': 'analytic'}
+    run_args.update(simulate_kwargs or {})
+    if cache_dir is not None:
+        run_args['cache'] = SimulationCache(cache_dir)
+    return [_run_segment(model, segment, horizon_years, n_timepoints, run_args) for segment in segments]
+
+
+def make_batches(segments, batch_size=50):
+    """
+    Split prepared segments into batches of at most batch_size segments with the same geometry.
+
+    Returns:
+        list of tuple: (model_args, list of segment dicts).
+    """
+    batches = []
+    for key, group in segments.groupby(list(GEOMETRY_KEYS), sort=False):
+        model_args = {name: value.item() if isinstance(value, np.generic) else value
+                      for name, value in zip(GEOMETRY_KEYS, key)}
+        records = group.to_dict('records')
+        batches += [(model_args, records[i:i + batch_size]) for i in range(0, len(records), batch_size)]
+    return batches
+
+
+def rank_segments(segments, results):
+    """
+    Merge the segment table with the results and rank by remaining lifetime (shortest first,
+    unknown lifetimes of failed runs last).
+
+    Returns:
+        pandas.DataFrame: RESULT_COLUMNS first, then the other input columns.
+    """
+    table = segments.merge(pd.DataFrame(results), on='segment_id', how='left')
+    table['remaining_years'] = table['lifetime_years'] - table['age_years']
+    table = table.sort_values('remaining_years', na_position='last', kind='stable', ignore_index=True)
+    table['rank'] = np.arange(1, len(table) + 1)
+    first = [name for name in RESULT_COLUMNS if name in table]
+    return table[first + [name for name in table.columns if name not in first]]
+
+
+def run_network(segments, output=None, horizon_years=100.0, n_workers=None, batch_size=50,
+                decay_rate_per_h=None, nz=25, simulation_mode='pipe', n_timepoints=201,
+                model_attributes=None, simulate_kwargs=None, cache_dir=None, verbose=True):
+    """
+    Remaining lifetime of every segment of a network, ranked (see module header).
+
+    The lifetime is the time at which Mw at the critical depth reaches MF_crit
+    (degradation_model.lifetime_years) under the constant (or seasonal) conditions of the segment;
+    the remaining lifetime subtracts age_years. Segments not reaching MF_crit within horizon_years
+    get inf; failed runs that did not reach it before the failure get NaN (ranked last).
+
+    Args:
+        segments (str or pandas.DataFrame): CSV/Parquet path or table of segments.
+        output (str or None): Path of the ranked table (.csv or .parquet).
+        horizon_years (float): Simulated duration of every segment.
+        n_workers (int or None): Number of processes (default: all cores). 1 runs serially.
+        batch_size (int): Segments per batch (one model per batch).
+        decay_rate_per_h, nz, simulation_mode: Defaults of prepare_segments.
+        n_timepoints, model_attributes, simulate_kwargs, cache_dir: See run_batch.
+        verbose (bool): Print one line per finished batch.
+
+    Returns:
+        pandas.DataFrame: Ranked table (see rank_segments).
+    """
+    if isinstance(segments, str):
+        segments = read_segments(segments)
+    segments = prepare_segments(segments, decay_rate_per_h, nz, simulation_mode)
+    batches = make_batches(segments, batch_size)
+    n_workers = n_workers or os.cpu_count() or 1
+    settings = (horizon_years, n_timepoints, model_attributes, simulate_kwargs, cache_dir)
+    results = []
+    start = time.time()
+
+    def collect(batch, batch_results):
+        results.extend(batch_results)
+        if verbose:
+            n_failed = sum(r['status'] != 'ok' for r in batch_results)
+            print(f"[{len(results)}/{len(segments)}] batch of {len(batch[1])} segments, L={batch[0]['L']:.2e}m "
+                  f"nz={batch[0]['nz']}{f', {n_failed} FAILED' if n_failed else ''} "
+                  f"({time.time() - start:.1f} s)")
+
+    if n_workers == 1:
+        for batch in batches:
+            collect(batch, run_batch(*batch, *settings))
+    else:
+        # At most 2 batches per worker in flight: the results of finished batches are small
+        queue = iter(batches)
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            pending = {pool.submit(run_batch, *batch, *settings): batch
+                       for batch in itertools.islice(queue, 2 * n_workers)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = pending.pop(future)
+                    try:
+                        batch_results = future.result()
+                    except Exception as e: # e.g. worker killed (BrokenProcessPool)
+                        batch_results = [{'segment_id': s['segment_id'], 'status': 'failed',
+                                          'message': f"{type(e).__name__}: {e}", 'lifetime_years': np.nan}
+                                         for s in batch[1]]
+                    collect(batch, batch_results)
+                for batch in itertools.islice(queue, len(done)):
+                    pending[pool.submit(run_batch, *batch, *settings)] = batch
+
+    table = rank_segments(segments, results)
+    if output is not None:
+        write_table(table, output)
+    if verbose:
+        n_ok = int((table['status'] == 'ok').sum())
+        print(f"Network finished: {n_ok}/{len(table)} segments successful in {time.time() - start:.1f} s "
+              f"({len(batches)} batches, {n_workers} workers)"
+              f"{f'; ranked table written to {output}' if output is not None else ''}")
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ranked remaining lifetime of the segments of a PE pipe network")
+    parser.add_argument('segments', help="segment table (.csv or .parquet, see network_batch.py header)")
+    parser.add_argument('output', help="ranked table written (.csv or .parquet)")
+    parser.add_argument('--horizon', type=float, default=100.0, help="simulated duration (years)")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--batch-size', type=int, default=50, help="segments per batch")
+    parser.add_argument('--decay-rate', type=float, default=None, help="bulk decay constant (1/h)")
+    parser.add_argument('--nz', type=int, default=25, help="grid size (if no nz column)")
+    parser.add_argument('--mode', default='pipe', choices=['pipe', 'film'], help="simulation mode (if no column)")
+    parser.add_argument('--cache', default=None, help="SimulationCache directory")
+    args = parser.parse_args()
+    run_network(args.segments, args.output, args.horizon, args.workers, args.batch_size, args.decay_rate,
+                args.nz, args.mode, cache_dir=args.cache)
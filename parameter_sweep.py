@@ -0,0 +1,155 @@
+## This module contains a parallel parameter-sweep engine for DegradationModel
+## (temperature, DOC concentration, thickness, AH0 multiplier...).
+##
+## Usage:
+##     scenarios = scenario_grid(T_celsius=[20, 40, 60], DOC_ppm=[0, 1, 5], L=[0.4e-3, 4.5e-3],
+##                               t_end_years=2.0, simulation_mode='pipe', nz=25)
+##     table = run_sweep(scenarios, n_workers=8)
+
+import contextlib
+import io
+import itertools
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from degradation_model import DegradationModel
+from simulation_cache import SimulationCache
+
+# Scenario keys passed to the model constructor; all the other keys go to simulate()
+MODEL_KEYS = ('L', 'nz', 'simulation_mode', 'Mw0', 'dens0', 'densa', 'Xc', 'mesh', 'mesh_stretch')
+# Scalar entries of sol.stats copied to the scenario results (cost breakdown of each run; n_rejected is a lower bound)
+SOLVER_STAT_KEYS = ('n_steps', 'n_rejected', 'njev', 'nlu', 'rhs_time_s', 'jac_time_s', 'linalg_time_s')
+
+
+def scenario_grid(**parameters):
+    """
+    Cartesian product of the parameter values.
+
+    Args:
+        **parameters: Each value is either a list/array (swept) or a scalar (fixed),
+                      e.g. T_celsius=[20, 40], DOC_ppm=[0, 5], t_end_years=1.0.
+
+    Returns:
+        list of dict: One dict per scenario.
+    """
+    names = list(parameters)
+    values = [v if isinstance(v, (list, tuple, np.ndarray)) else [v] for v in parameters.values()]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def run_scenario(scenario, model_class=DegradationModel, n_obs=50, observables=('oit_avg', 'co_surface'),
+                 model_attributes=None, cache_dir=None, simulate_kwargs=None):
+    """
+    Run one scenario and return a compact result (never raises).
+
+    Args:
+        scenario (dict): Model keys (MODEL_KEYS) and simulate() arguments (T_celsius, DOC_ppm,
+                         t_end_years, AH0_mult, ...). Optional 'times_years' for the observation times.
+        model_class (type): Model class (must be importable by the worker processes).
+        n_obs (int): Number of observation times in [0, t_end_years] if 'times_years' is not given.
+        observables (sequence of str): Time series returned (see DegradationModel.observe).
+        model_attributes (dict or None): Attributes set on the model after construction
+                                         (e.g. {'ti0_oit': 291.07}).
+        cache_dir (str or None): SimulationCache directory shared by the workers.
+        simulate_kwargs (dict or None): Default simulate() arguments (overridden by the scenario;
+                                        fallback=True and jacobian='analytic' unless given).
+
+    Returns:
+        dict: Scenario parameters, status ('ok' or 'failed'), message, wall_time_s, nfev,
+              the solver statistics of SOLVER_STAT_KEYS (see DegradationModel.simulate), t_years,
+              the observables, and the final profiles (z_mm, AH_final, CO_final, oit_final).
+    """
+    start = time.time()
+    result = dict(scenario)
+    scenario = dict(scenario)
+    times_years = scenario.pop('times_years', None)
+    model_args = {key: scenario.pop(key) for key in MODEL_KEYS if key in scenario}
+    run_args = {'fallback': True, 'jacobian': 'analytic'}
+    run_args.update(simulate_kwargs or {})
+    run_args.update(scenario)
+    if times_years is None:
+        times_years = np.linspace(0.0, run_args['t_end_years'], n_obs)
+    run_args.pop('t_end_years', None)
+    if cache_dir is not None:
+        run_args['cache'] = SimulationCache(cache_dir)
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = model_class(**model_args)
+            for name, value in (model_attributes or {}).items():
+                setattr(model, name, value)
+            sol, observed = model.simulate_at(times_years=times_years,
+                                              observables=tuple(observables) + ('state',), **run_args)
+        result.update(status='ok' if sol.success else 'failed', message=sol.message, nfev=sol.nfev)
+        stats = getattr(sol, 'stats', None) or {} # Absent from results cached by older versions
+        result.update({key: stats.get(key) for key in SOLVER_STAT_KEYS})
+        if sol.success:
+            state = observed.pop('state')
+            AH_final = state[model.idx['AH'], :, -1]
+            result.update(observed)
+            result.update(
+                z_mm=model.z * 1000,
+                AH_final=AH_final,
+                CO_final=state[model.idx['CO'], :, -1],
+                oit_final=model.calculate_oit(AH_final, sol.sim_params['AH0_conc_used']),
+            )
+    except Exception as e:
+        result.update(status='failed', message=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+    result['wall_time_s'] = time.time() - start
+    return result
+
+
+def run_sweep(scenarios, n_workers=None, verbose=True, **scenario_kwargs):
+    """
+    Run all scenarios over a process pool and collect the results in one table.
+
+    A failed scenario (solver failure, exception, crashed worker) is recorded with
+    status 'failed' and does not stop the sweep.
+
+    Args:
+        scenarios (list of dict): E.g. from scenario_grid().
+        n_workers (int or None): Number of processes (default: all cores). 1 runs serially.
+        verbose (bool): Print one line per finished scenario.
+        **scenario_kwargs: Passed to run_scenario (model_class, n_obs, observables,
+                           model_attributes, cache_dir, simulate_kwargs).
+
+    Returns:
+        pandas.DataFrame: One row per scenario, in the order of `scenarios`.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    results = [None] * len(scenarios)
+    start = time.time()
+
+    def report(i):
+        if verbose:
+            r = results[i]
+            print(f"[{sum(x is not None for x in results)}/{len(scenarios)}] {scenarios[i]} -> "
+                  f"{r['status']} ({r.get('wall_time_s', 0.0):.1f} s)")
+
+    if n_workers == 1:
+        for i, scenario in enumerate(scenarios):
+            results[i] = run_scenario(scenario, **scenario_kwargs)
+            report(i)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {pool.submit(run_scenario, scenario, **scenario_kwargs): i
+                       for i, scenario in enumerate(scenarios)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e: # e.g. worker killed (BrokenProcessPool)
+                    results[i] = dict(scenarios[i], status='failed', message=f"{type(e).__name__}: {e}")
+                report(i)
+
+    table = pd.DataFrame(results)
+    if verbose:
+        n_ok = int((table['status'] == 'ok').sum())
+        print(f"Sweep finished: {n_ok}/{len(table)} scenarios successful in {time.time() - start:.1f} s "
+              f"({n_workers} workers)")
+    return table
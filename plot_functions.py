@@ -1,7 +1,42 @@
 ## This module contains functions for plotting simulation results, including concentration profiles and OIT validation.
+##
+## Batch rendering (headless, parallel) of many results or result-store directories:
+##     render_batch(["runs/scenario_000", "runs/scenario_001", ...], "report_figures", n_workers=8)
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
 
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from degradation_model import DegradationModel
+from result_store import load_result
+## This function returns the (nz, nt) concentrations of one species, from an in-memory solution
+## or lazily from a result_store.StoredResult (only the requested species/time indices are read).
+def get_species_values(sol, species_idx, n_species, nz, time_indices=None):
+    """
+    Args:
+        sol: solve_ivp/simulate result or result_store.StoredResult.
+        species_idx (int): Index of the species (model.idx[name]).
+        n_species, nz (int): State layout of the model.
+        time_indices (array-like or None): Time indices to return (None: all).
+
+    Returns:
+        numpy.ndarray: Shape (nz, n_selected_times).
+    """
+    if hasattr(sol, 'species_values'):
+        return sol.species_values(species_idx, time_indices)
+    C = np.asarray(sol.y).reshape((n_species, nz, len(sol.t)))[species_idx]
+    return C if time_indices is None else C[:, time_indices]
+## This function checks that a solution (in memory or stored) is successful and not empty.
+def has_results(sol):
+    if not (sol and hasattr(sol, 'success') and sol.success):
+        return False
+    if hasattr(sol, 'species_values'):
+        return len(sol.t) > 0
+    return sol.y is not None and sol.y.size > 0
 ## This function plots concentration profiles vs. depth for specified species at different times.
 def plot_profiles_evolution(model_object, sol, species_to_plot, 
                             title_suffix="", 
@@ -21,8 +56,6 @@ def plot_profiles_evolution(model_object, sol, species_to_plot,
     species_idx_map = model_object.idx
 
     times_sec = sol.t
-    y_data = np.asarray(sol.y) 
-    C_all_times = y_data.reshape((n_species_model, nz_model, len(times_sec)))
     z_mm = z_coords_m * 1000
 
     if not species_to_plot:
@@ -68,11 +101,13 @@ def plot_profiles_evolution(model_object, sol, species_to_plot,
         
         ax = axes_list[i]
         species_idx = species_idx_map[species_name]
+        # Only the plotted time indices of this species are read
+        profiles = get_species_values(sol, species_idx, n_species_model, nz_model, np.asarray(indices_to_plot))
         
         # Plot concentration profiles at different times
         for j, time_idx in enumerate(indices_to_plot):
             time_years = times_sec[time_idx] / (365.25 * 24 * 3600)
-            concentration = C_all_times[species_idx, :, time_idx]
+            concentration = profiles[:, j]
             ax.plot(z_mm, concentration, color=colors[j], 
                    label=f't = {time_years:.2f} yr', linewidth=2)
         
@@ -103,14 +138,15 @@ def plot_profiles_evolution(model_object, sol, species_to_plot,
     return fig, axes_grid
 ## This function plots OIT validation comparing experimental and simulated data.
 def plot_OIT_H20_validation(model_object, experimental_times_months, experimental_oit, simulated_oit, 
-                           temp_celsius, pipe_thickness_m, save_filename=None):
+                           temp_celsius, pipe_thickness_m, save_filename=None, show=True):
     """
-    Plot OIT validation comparing experimental and simulated data
+    Plot OIT validation comparing experimental and simulated data.
+    The figure is saved before being shown (plt.show() may clear it); show=False for headless use.
     """
     # Use attributes from the passed model_object
     ti0_oit = model_object.ti0_oit
     
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
     
     # Plot experimental data (filter NaN)
     valid_exp_indices = ~np.isnan(experimental_oit)
@@ -141,10 +177,12 @@ def plot_OIT_H20_validation(model_object, experimental_times_months, experimenta
     plt.xticks(np.arange(0, 10, 1))
     
     plt.tight_layout()
-    plt.show()
     
     if save_filename:
-        plt.savefig(save_filename, dpi=300, bbox_inches='tight')
+        fig.savefig(save_filename, dpi=300, bbox_inches='tight')
+    if show:
+        plt.show()
+    return fig
 ## This function calculates OIT for plotting, adapted from the model class.
 def calculate_oit_for_plot(AH_profile_at_time_t, AH0_initial_for_material, ti0_oit_material):
     """
@@ -156,6 +194,45 @@ def calculate_oit_for_plot(AH_profile_at_time_t, AH0_initial_for_material, ti0_o
     ah_ratio = np.maximum(0, AH_profile_at_time_t) / AH0_initial_for_material
     oit = ti0_oit_material * ah_ratio
     return np.maximum(0, oit)
+## This function returns the weights of the thickness averages of a solution (see DegradationModel.average_weights).
+def thickness_weights(sol, model_nz, avg_weights=None):
+    """
+    Args:
+        sol: simulate result or result_store.StoredResult.
+        model_nz (int): Number of nodes of the model.
+        avg_weights (array-like or None): model.avg_weights; required for a non-uniform mesh
+                                          unless sol carries them (batch rendering results).
+
+    Returns:
+        numpy.ndarray: Weights, shape (model_nz,).
+    """
+    if avg_weights is None:
+        avg_weights = getattr(sol, 'avg_weights', None)
+    if avg_weights is not None:
+        return np.asarray(avg_weights, dtype=float)
+    mesh = getattr(sol, 'sim_params', {}).get('mesh', 'uniform')
+    if mesh != 'uniform':
+        raise ValueError(f"solution computed on a '{mesh}' mesh: pass avg_weights=model.avg_weights "
+                         f"(a plain mean over the nodes would bias the thickness averages)")
+    return DegradationModel.average_weights(np.zeros(model_nz))
+## This function computes the simulated OIT (thickness average) and surface [CO] series of a solution, vectorized over time.
+def oit_co_series(sol, model_n_species, model_nz, model_idx_AH, model_idx_CO, model_ti0_oit, avg_weights=None):
+    """
+    Args:
+        sol: simulate result or result_store.StoredResult (with the state).
+        model_n_species, model_nz, model_idx_AH, model_idx_CO (int): State layout of the model.
+        model_ti0_oit (float): OIT of the unaged material (min).
+        avg_weights (array-like or None): model.avg_weights (see thickness_weights).
+
+    Returns:
+        tuple: (oit_avg, co_surface), arrays over sol.t.
+    """
+    AH0_used = getattr(sol, 'sim_params', {}).get('AH0_conc_used', 0)
+    weights = thickness_weights(sol, model_nz, avg_weights)
+    AH_profiles = get_species_values(sol, model_idx_AH, model_n_species, model_nz) # (nz, nt)
+    oit_avg = np.tensordot(weights, calculate_oit_for_plot(AH_profiles, AH0_used, model_ti0_oit), axes=(0, 0))
+    co_surface = get_species_values(sol, model_idx_CO, model_n_species, model_nz)[0, :]
+    return oit_avg, co_surface
 ## This function plots the OIT and Carbonyl validation for HOCl aging, comparing experimental data with model simulations.
 def plot_suez_hocl_validation( 
                                  experimental_times_months,
@@ -170,13 +247,15 @@ def plot_suez_hocl_validation(
                                  model_L_meters,
                                  model_ti0_oit, # OIT initial du matériau pour l'échelle de l'axe Y
                                  carbonyl_exp_label="Indice Carbonyle Exp. (u.a.)",
-                                 title_extra=""):
+                                 title_extra="",
+                                 model_avg_weights=None): # model.avg_weights, requis si maillage non uniforme
     """
     Trace les OIT et les Carbonyles (expérimentaux et simulés) pour le vieillissement HOCl
     en confrontant les données SUEZ avec les simulations du modèle.
     Cette fonction est autonome et destinée à être dans un module.
+    L'OIT moyen est pondéré par model_avg_weights (voir oit_co_series).
     """
-    if not (solution_hocl_sim and hasattr(solution_hocl_sim, 'success') and solution_hocl_sim.success and solution_hocl_sim.y.size > 0):
+    if not has_results(solution_hocl_sim):
         print("plot_suez_hocl_validation: Simulation HOCl non fournie, non réussie, ou avec des résultats vides. Impossible de tracer.")
         return None, None, None
 
@@ -185,23 +264,15 @@ def plot_suez_hocl_validation(
     sim_times_sec = solution_hocl_sim.t
     sim_times_months = sim_times_sec / (365.25 * 24 * 3600 / 12) 
 
-    C_all_times_sim = solution_hocl_sim.y.reshape((model_n_species, model_nz, len(sim_times_sec)))
-    
-    AH_profiles_sim = C_all_times_sim[model_idx_AH, :, :]
     AH0_actual_conc_used_sim = sim_params.get('AH0_conc_used', 0) 
     if AH0_actual_conc_used_sim == 0:
         print("plot_suez_hocl_validation: Attention: AH0_conc_used non trouvé dans sim_params ou est zéro. OIT simulé sera incorrect.")
         # Pourrait être un fallback ici si vous avez une valeur de base pour le multiplicateur AH0
         # AH0_actual_conc_used_sim = fallback_AH0_base * sim_params.get('AH0_mult',1.0)
 
-
-    simulated_oit_profiles_at_each_t_eval = np.array([
-        calculate_oit_for_plot(AH_profiles_sim[:, t_idx], AH0_actual_conc_used_sim, model_ti0_oit) 
-        for t_idx in range(len(sim_times_sec))
-    ])
-    simulated_oit_avg_vs_time = np.mean(simulated_oit_profiles_at_each_t_eval, axis=1)
-
-    simulated_co_surface_vs_time = C_all_times_sim[model_idx_CO, 0, :] 
+    simulated_oit_avg_vs_time, simulated_co_surface_vs_time = oit_co_series(
+        solution_hocl_sim, model_n_species, model_nz, model_idx_AH, model_idx_CO, model_ti0_oit,
+        model_avg_weights)
 
     # --- Création du Graphique ---
     fig, ax1 = plt.subplots(figsize=(12, 7))
@@ -343,12 +414,13 @@ def plot_suez_combined_validation(
                                  co_sim_label='[CO] Simulé surface (mol/L)',
                                  color_oit_exp='blue', color_oit_sim='red',
                                  color_co_exp='green', color_co_sim='purple',
-                                 title_extra=""):
+                                 title_extra="",
+                                 model_avg_weights=None): # model.avg_weights, requis si maillage non uniforme
     """
     Trace les OIT et les Carbonyles (expérimentaux et simulés) pour une condition donnée.
-    Sauvegarde la figure.
+    Sauvegarde la figure. L'OIT moyen est pondéré par model_avg_weights (voir oit_co_series).
     """
-    if not (solution_sim and hasattr(solution_sim, 'success') and solution_sim.success and solution_sim.y.size > 0):
+    if not has_results(solution_sim):
         print(f"{plot_title_prefix}: Simulation non fournie ou non réussie. Impossible de tracer.")
         return None, None, None
 
@@ -356,19 +428,13 @@ def plot_suez_combined_validation(
     sim_times_sec = solution_sim.t
     sim_times_months_simulation = sim_times_sec / (365.25 * 24 * 3600 / 12) 
 
-    C_all_times_sim = solution_sim.y.reshape((model_n_species, model_nz, len(sim_times_sec)))
-    
-    AH_profiles_sim = C_all_times_sim[model_idx_AH, :, :]
     AH0_actual_conc_used_sim = sim_params.get('AH0_conc_used', 0)
     if AH0_actual_conc_used_sim == 0:
         print(f"{plot_title_prefix}: Attention: AH0_conc_used non trouvé. OIT simulé sera incorrect.")
 
-    simulated_oit_profiles_at_each_t_eval = np.array([
-        calculate_oit_for_plot(AH_profiles_sim[:, t_idx], AH0_actual_conc_used_sim, model_ti0_oit) 
-        for t_idx in range(len(sim_times_sec))
-    ])
-    simulated_oit_avg_vs_time = np.mean(simulated_oit_profiles_at_each_t_eval, axis=1)
-    simulated_co_surface_vs_time = C_all_times_sim[model_idx_CO, 0, :] 
+    simulated_oit_avg_vs_time, simulated_co_surface_vs_time = oit_co_series(
+        solution_sim, model_n_species, model_nz, model_idx_AH, model_idx_CO, model_ti0_oit,
+        model_avg_weights)
 
     fig, ax1 = plt.subplots(figsize=(12, 7))
 
@@ -447,4 +513,222 @@ def plot_suez_combined_validation(
     except Exception as e:
         print(f"Erreur lors de la sauvegarde du graphique '{nom_fichier_figure}': {e}")
     
-    return fig, ax1, ax2
\ No newline at end of file
+    return fig, ax1, ax2
+
+## Batch rendering. The templates below are matplotlib Figure objects created outside pyplot: they are
+## drawn by the non-interactive Agg canvas, never displayed nor kept by pyplot, and are reused from one
+## result to the next (only the data, labels and titles change), which avoids the figure setup cost.
+def _open_result(item):
+    """Result to render: a result-store path (opened lazily) or an already extracted result."""
+    if not isinstance(item, (str, os.PathLike)):
+        return item
+    result = load_result(item)
+    result.L = result.meta['L']
+    result.ti0_oit = result.meta['ti0_oit']
+    # Weights of the thickness averages (the fingerprint stores z itself for a non-uniform mesh)
+    mesh = 'uniform' if result.meta['model_parameters'].get('z') == 'uniform' else 'custom'
+    result.avg_weights = DegradationModel.average_weights(result.z, mesh)
+    return result
+## This function makes an in-memory (sol, model) pair picklable for the rendering workers.
+def _result_view(sol, model):
+    return SimpleNamespace(
+        t=np.asarray(sol.t), y=None if getattr(sol, 'y', None) is None else np.asarray(sol.y),
+        success=bool(sol.success), message=str(sol.message), sim_params=dict(getattr(sol, 'sim_params', {})),
+        observables=dict(getattr(sol, 'observables', None) or {}), n_species=model.n_species, nz=model.nz,
+        z=np.asarray(model.z), avg_weights=np.asarray(model.avg_weights), idx=dict(model.idx), L=model.L,
+        ti0_oit=model.ti0_oit)
+def _has_state(result):
+    if hasattr(result, 'meta'): # StoredResult
+        return result.meta['has_state']
+    return result.y is not None
+## This function returns the OIT average and surface [CO] series of a result: from the state if it was
+## kept, otherwise from the streamed observables (simulate(..., reducers=('oit_avg', 'co_surface'))).
+def _result_series(result):
+    if _has_state(result):
+        return oit_co_series(result, result.n_species, result.nz, result.idx['AH'], result.idx['CO'], result.ti0_oit)
+    observables = result.observables
+    if 'oit_avg' not in observables or 'co_surface' not in observables:
+        raise ValueError("neither the state nor the oit_avg/co_surface observables were stored")
+    return observables['oit_avg'], observables['co_surface']
+def _conditions(result):
+    sim_params = getattr(result, 'sim_params', {})
+    return (f"L={result.L*1000:.1f}mm, {sim_params.get('T_celsius', 'N/A')}°C, "
+            f"DOC={sim_params.get('DOC_ppm', 'N/A')}ppm")
+class _OITCOTemplate:
+    """Twin-axis OIT / surface [CO] vs. time figure (same layout as plot_suez_combined_validation)."""
+    def __init__(self, experimental=None):
+        self.fig = Figure(figsize=(12, 7))
+        self.ax1 = self.fig.add_subplot()
+        self.ax2 = self.ax1.twinx()
+        self.ax1.set_xlabel("Temps de Vieillissement (mois)")
+        self.ax1.set_ylabel("OIT (min)", color='red')
+        self.ax2.set_ylabel("[CO] Simulé surface (mol/L)", color='purple')
+        self.oit_line, = self.ax1.plot([], [], marker='s', linestyle='--', color='red', label='OIT Simulé')
+        self.co_line, = self.ax2.plot([], [], marker='x', linestyle=':', color='purple',
+                                      label='[CO] Simulé surface (mol/L)')
+        # Experimental data (the same for every result) are drawn once
+        if experimental:
+            times = np.asarray(experimental['times_months'], dtype=float)
+            for key, ax, style, color, label in (('oit', self.ax1, 'o-', 'blue', 'OIT Expérimental'),
+                                                 ('carbonyl', self.ax2, '^-', 'green', 'Indice Carbonyle Exp. (u.a.)')):
+                if experimental.get(key) is not None:
+                    values = np.asarray(experimental[key], dtype=float)
+                    valid = ~np.isnan(values)
+                    ax.plot(times[valid], values[valid], style, color=color, label=label)
+        lines1, labels1 = self.ax1.get_legend_handles_labels()
+        lines2, labels2 = self.ax2.get_legend_handles_labels()
+        self.ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper right')
+        self.ax1.grid(True, linestyle=':')
+        self.fig.tight_layout(rect=[0, 0, 1, 0.95])
+
+    def render(self, result, path, title, dpi):
+        oit_avg, co_surface = _result_series(result)
+        times_months = result.t / (365.25 * 24 * 3600 / 12)
+        self.oit_line.set_data(times_months, oit_avg)
+        self.co_line.set_data(times_months, co_surface)
+        for ax in (self.ax1, self.ax2):
+            ax.relim()
+            ax.autoscale_view()
+            ax.set_ylim(bottom=0, auto=None)
+        self.ax1.set_title(f"{title}\n({_conditions(result)})")
+        self.fig.savefig(path, dpi=dpi)
+
+    def close(self):
+        self.fig.clear()
+class _ProfilesTemplate:
+    """Species profiles vs. depth at n_profiles times (same layout as plot_profiles_evolution)."""
+    def __init__(self, species_to_plot, n_profiles):
+        n_cols = min(3, len(species_to_plot))
+        n_rows = (len(species_to_plot) + n_cols - 1) // n_cols
+        self.fig = Figure(figsize=(6 * n_cols, 5 * n_rows))
+        axes_list = self.fig.subplots(n_rows, n_cols, sharex=True, squeeze=False).flatten()
+        colors = plt.cm.viridis(np.linspace(0, 1, n_profiles))
+        self.n_profiles = n_profiles
+        self.lines = {}
+        for i, species_name in enumerate(species_to_plot):
+            ax = axes_list[i]
+            self.lines[species_name] = [ax.plot([], [], color=color, linewidth=2, label=' ')[0] for color in colors]
+            ax.set_title(species_name, fontweight='bold')
+            ax.set_ylabel('Concentration')
+            ax.grid(True, alpha=0.3)
+            if i % n_cols == 0:
+                ax.legend(loc='upper right', fontsize='x-small')
+            if i + n_cols >= len(species_to_plot): # No axis below
+                ax.set_xlabel('Depth (mm)')
+                ax.tick_params(labelbottom=True)
+            else:
+                ax.tick_params(labelbottom=False)
+        for j in range(len(species_to_plot), len(axes_list)):
+            self.fig.delaxes(axes_list[j])
+        self.fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+
+    def render(self, result, path, title, dpi):
+        if not _has_state(result):
+            raise ValueError("profiles need the state (simulated with keep_state=False)")
+        indices = np.linspace(0, len(result.t) - 1, self.n_profiles, dtype=int)
+        times_years = result.t[indices] / (365.25 * 24 * 3600)
+        z_mm = np.asarray(result.z) * 1000
+        for species_name, lines in self.lines.items():
+            profiles = get_species_values(result, result.idx[species_name], result.n_species, result.nz, indices)
+            for line, profile in zip(lines, profiles.T):
+                line.set_data(z_mm, profile)
+            ax = lines[0].axes
+            ax.relim()
+            ax.autoscale_view()
+            legend = ax.get_legend()
+            if legend is not None:
+                for text, time_years in zip(legend.get_texts(), times_years):
+                    text.set_text(f't = {time_years:.2f} yr')
+        self.fig.suptitle(f"Concentration Profiles Evolution - {title} ({_conditions(result)})", fontsize=12)
+        self.fig.savefig(path, dpi=dpi)
+
+    def close(self):
+        self.fig.clear()
+## This function renders the figures of a chunk of results in one worker, reusing one template per figure kind.
+def _render_chunk(items, names, output_dir, kinds, species_to_plot, n_profiles, experimental, dpi, file_format):
+    templates = {}
+    report = []
+    try:
+        for item, name in zip(items, names):
+            entry = {'name': name, 'files': [], 'status': 'ok', 'message': ''}
+            try:
+                result = _open_result(item)
+                if not result.success:
+                    raise ValueError(f"failed simulation: {result.message}")
+                for kind in kinds:
+                    if kind not in templates:
+                        templates[kind] = (_OITCOTemplate(experimental) if kind == 'oit_co'
+                                           else _ProfilesTemplate(species_to_plot, n_profiles))
+                    path = os.path.join(output_dir, f"{name}_{kind}.{file_format}")
+                    templates[kind].render(result, path, name, dpi)
+                    entry['files'].append(path)
+            except Exception as e:
+                entry.update(status='failed', message=f"{type(e).__name__}: {e}")
+            report.append(entry)
+    finally:
+        for template in templates.values():
+            template.close()
+    return report
+## This function renders report figures of many results (or result-store directories) in parallel, headless.
+def render_batch(results, output_dir, kinds=('oit_co', 'profiles'), species_to_plot=('AH', 'CO', 'O2', 'DOC'),
+                 n_profiles=5, names=None, experimental=None, n_workers=None, chunk_size=None,
+                 dpi=150, file_format='png', verbose=True):
+    """
+    Render the figures of many results over a process pool, without any interactive backend.
+    Each worker renders a chunk of results with one reused figure per kind and frees it at the end.
+
+    Args:
+        results (list): Result-store directories (paths), StoredResult objects, or (sol, model) pairs.
+        output_dir (str): Output directory (created); files are named <name>_<kind>.<file_format>.
+        kinds (sequence of str): 'oit_co' (thickness-averaged OIT and surface [CO] vs. time, from the
+                                 state or from the streamed observables) and/or 'profiles' (profiles of
+                                 species_to_plot at n_profiles evenly spaced times, state needed).
+        species_to_plot (sequence of str), n_profiles (int): Content of the 'profiles' figures.
+        names (list of str or None): File name prefixes (default: result directory names, or result_000...).
+        experimental (dict or None): {'times_months', 'oit', 'carbonyl'} drawn on every 'oit_co' figure.
+        n_workers (int or None): Number of processes (default: all cores). 1 renders in this process.
+        chunk_size (int or None): Results per worker task (default: about 4 tasks per worker).
+        dpi (int), file_format (str): Output resolution and format ('png', 'pdf', 'svg'...).
+        verbose (bool): Print a summary.
+
+    Returns:
+        list of dict: Per result, in order: name, files, status ('ok' or 'failed'), message.
+    """
+    unknown = [kind for kind in kinds if kind not in ('oit_co', 'profiles')]
+    if unknown:
+        raise ValueError(f"Unknown figure kinds: {unknown}")
+    items, default_names = [], []
+    for i, item in enumerate(results):
+        if hasattr(item, 'species_values') and hasattr(item, 'path'): # StoredResult: reopened in the worker
+            item = item.path
+        if isinstance(item, tuple):
+            item = _result_view(*item)
+        items.append(item)
+        default_names.append(os.path.basename(os.path.normpath(item)) if isinstance(item, (str, os.PathLike))
+                             else f"result_{i:03d}")
+    names = list(names) if names is not None else default_names
+    os.makedirs(output_dir, exist_ok=True)
+    settings = (output_dir, tuple(kinds), tuple(species_to_plot), n_profiles, experimental, dpi, file_format)
+
+    n_workers = n_workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, -(-len(items) // (4 * n_workers)))
+    chunks = [(items[i:i + chunk_size], names[i:i + chunk_size]) for i in range(0, len(items), chunk_size)]
+    report = []
+    if n_workers == 1:
+        for chunk_items, chunk_names in chunks:
+            report += _render_chunk(chunk_items, chunk_names, *settings)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(_render_chunk, chunk_items, chunk_names, *settings)
+                       for chunk_items, chunk_names in chunks]
+            for future, (_, chunk_names) in zip(futures, chunks):
+                try:
+                    report += future.result()
+                except Exception as e: # e.g. worker killed (BrokenProcessPool)
+                    report += [{'name': name, 'files': [], 'status': 'failed', 'message': f"{type(e).__name__}: {e}"}
+                               for name in chunk_names]
+    if verbose:
+        n_ok = sum(entry['status'] == 'ok' for entry in report)
+        print(f"render_batch: {sum(len(entry['files']) for entry in report)} figures for {n_ok}/{len(report)} "
+              f"results written to {output_dir}")
+    return report
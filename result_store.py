@@ -0,0 +1,166 @@
+## This module contains a chunked, memory-mapped on-disk format for simulation results.
+##
+## A result is a directory:
+##     meta.json          sim_params, species, idx, model parameters, message...
+##     t.npy, z.npy       time (s) and depth (m) grids
+##     <species>.npy      one chunk per species, shape (nt, nz), memory-mapped on load
+##     observables.npz    streamed observables (sol.observables), if any
+##
+## Usage:
+##     save_result("runs/fig4_66ppm", sol, model)
+##     res = load_result("runs/fig4_66ppm")
+##     AH = res.species_values('AH', time_indices=[0, -1])  # reads only these rows
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return repr(obj)
+
+
+def save_result(path, sol, model, overwrite=True):
+    """
+    Write a simulation result to a result directory.
+
+    Args:
+        path (str): Result directory (created; replaced if overwrite=True).
+        sol: Result of DegradationModel.simulate (sol.y may be None if only observables were kept).
+        model: The model that produced sol (grid, species and parameters are stored).
+        overwrite (bool): Replace an existing result directory.
+
+    Returns:
+        str: path.
+    """
+    if os.path.exists(path):
+        if not overwrite:
+            raise FileExistsError(f"Result directory '{path}' already exists")
+        shutil.rmtree(path)
+    tmp_path = path.rstrip(os.sep) + ".tmp"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    t = np.asarray(sol.t)
+    np.save(os.path.join(tmp_path, "t.npy"), t)
+    np.save(os.path.join(tmp_path, "z.npy"), np.asarray(model.z))
+
+    has_state = getattr(sol, 'y', None) is not None
+    if has_state:
+        C = np.asarray(sol.y).reshape((model.n_species, model.nz, len(t)))
+        for name in model.species:
+            # (nt, nz): a profile at one time is a contiguous row of the chunk
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(C[model.idx[name]].T))
+
+    observables = getattr(sol, 'observables', None)
+    if observables:
+        np.savez(os.path.join(tmp_path, "observables.npz"), **observables)
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'species': list(model.species), 'idx': dict(model.idx),
+        'n_species': model.n_species, 'nz': model.nz, 'nt': len(t), 'L': model.L,
+        'has_state': has_state, 'success': bool(sol.success), 'message': str(sol.message),
+        'nfev': int(getattr(sol, 'nfev', 0)),
+        'stats': getattr(sol, 'stats', None),
+        'sim_params': getattr(sol, 'sim_params', {}),
+        'model_parameters': model.parameter_fingerprint(),
+        'ti0_oit': model.ti0_oit,
+    }
+    with open(os.path.join(tmp_path, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1, default=_json_default)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_result(path):
+    """Open a result directory (lazily: species chunks are memory-mapped on first access)."""
+    return StoredResult(path)
+
+
+class StoredResult:
+    """
+    Read-only view of a stored simulation result.
+
+    Behaves like the solve_ivp result for the attributes used by the notebooks and
+    plot_functions (t, success, message, sim_params, y), but species and time slices
+    can be read without loading the whole file through species_values()/state().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.species = self.meta['species']
+        self.idx = self.meta['idx']
+        self.n_species = self.meta['n_species']
+        self.nz = self.meta['nz']
+        self.sim_params = self.meta['sim_params']
+        self.success = self.meta['success']
+        self.message = self.meta['message']
+        self.nfev = self.meta['nfev']
+        self.stats = self.meta.get('stats') # Solver statistics (step_t/step_h as lists)
+        self.t = np.load(os.path.join(path, "t.npy"))
+        self.z = np.load(os.path.join(path, "z.npy"))
+        self._chunks = {}
+
+    def __repr__(self):
+        return (f"StoredResult('{self.path}', nz={self.nz}, nt={len(self.t)}, "
+                f"T={self.sim_params.get('T_celsius')}°C, DOC={self.sim_params.get('DOC_ppm')} ppm)")
+
+    def _chunk(self, name):
+        if not self.meta['has_state']:
+            raise ValueError(f"'{self.path}' only contains observables (simulated with keep_state=False)")
+        if name not in self._chunks:
+            self._chunks[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+        return self._chunks[name]
+
+    def species_values(self, name, time_indices=None):
+        """
+        Concentration of one species.
+
+        Args:
+            name (str or int): Species name (or index in species).
+            time_indices (int, slice, array-like or None): Time indices to read (None: all).
+
+        Returns:
+            numpy.ndarray: Shape (nz, n_selected_times), or (nz,) for a single integer index.
+        """
+        if not isinstance(name, str):
+            name = self.species[name]
+        chunk = self._chunk(name)
+        rows = chunk if time_indices is None else chunk[time_indices]
+        return np.array(rows).T
+
+    def state(self, time_indices=None, species=None):
+        """
+        Concentrations of several species.
+
+        Returns:
+            numpy.ndarray: Shape (n_selected_species, nz, n_selected_times).
+        """
+        species = self.species if species is None else species
+        return np.stack([self.species_values(name, time_indices) for name in species])
+
+    @property
+    def observables(self):
+        """Streamed observables (dict of arrays), empty if none were stored."""
+        obs_path = os.path.join(self.path, "observables.npz")
+        if not os.path.exists(obs_path):
+            return {}
+        with np.load(obs_path) as data:
+            return {name: data[name] for name in data.files}
+
+    @property
+    def y(self):
+        """Full state (n_species*nz, nt), as in solve_ivp results (reads every chunk)."""
+        return self.state().reshape((self.n_species * self.nz, len(self.t)))
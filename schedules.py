@@ -0,0 +1,78 @@
+## This module contains time schedules for the operating conditions of DegradationModel.simulate
+## (water temperature T(t), disinfectant concentration DOC_ppm(t)).
+##
+## Usage:
+##     T = Schedule.seasonal(mean=12.0, amplitude=6.0)              # °C, repeated every year
+##     DOC = Schedule([0, 0.5, 1.0], [0.8, 0.3, 0.8], period_years=1.0)   # ppm
+##     sol = model.simulate(T_celsius=T, DOC_ppm=DOC, t_end_years=30, fallback=True)
+
+import numpy as np
+
+
+class Schedule:
+    """
+    Piecewise-linear function of time (years), optionally repeated with a period.
+
+    Any callable f(t_years) is accepted by simulate(); Schedule adds a stable repr
+    (so that simulations using it can be cached) and periodic repetition.
+    """
+
+    def __init__(self, times_years, values, period_years=None):
+        """
+        Args:
+            times_years (array-like): Increasing times (years) of the breakpoints.
+            values (array-like): Values at the breakpoints (linear interpolation in between,
+                                 constant before the first and after the last breakpoint).
+            period_years (float or None): If given, t is taken modulo period_years, so a one-year
+                                          profile is repeated over decades. The breakpoints should
+                                          then cover [0, period_years] with equal end values.
+        """
+        self.times_years = np.asarray(times_years, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        if self.times_years.ndim != 1 or self.times_years.shape != self.values.shape or len(self.times_years) < 1:
+            raise ValueError("times_years and values must be 1-D arrays of the same length")
+        if np.any(np.diff(self.times_years) <= 0):
+            raise ValueError("times_years must be strictly increasing")
+        if period_years is not None and period_years <= 0:
+            raise ValueError("period_years must be positive")
+        self.period_years = period_years
+
+    @classmethod
+    def seasonal(cls, mean, amplitude, peak_fraction=0.6, n_points=25, period_years=1.0):
+        """
+        Sinusoidal yearly profile, e.g. seasonal water temperature.
+
+        Args:
+            mean (float): Mean value.
+            amplitude (float): Half of the peak-to-peak variation.
+            peak_fraction (float): Time of the maximum as a fraction of the period (0.6: early August).
+            n_points (int): Number of breakpoints per period.
+            period_years (float): Period (years).
+        """
+        t = np.linspace(0.0, period_years, n_points)
+        return cls(t, mean + amplitude * np.cos(2 * np.pi * (t / period_years - peak_fraction)), period_years)
+
+    @classmethod
+    def constant(cls, value):
+        return cls([0.0], [value])
+
+    def __call__(self, t_years):
+        t = np.asarray(t_years, dtype=float)
+        if self.period_years is not None:
+            t = np.mod(t, self.period_years)
+        result = np.interp(t, self.times_years, self.values)
+        return float(result) if result.ndim == 0 else result
+
+    def __repr__(self):
+        return (f"Schedule(times_years={self.times_years.tolist()}, values={self.values.tolist()}, "
+                f"period_years={self.period_years})")
+
+    def __str__(self):
+        period = f", period {self.period_years:g} yr" if self.period_years is not None else ""
+        return f"schedule[{self.values.min():g}..{self.values.max():g}{period}]"
+
+    def __eq__(self, other):
+        return isinstance(other, Schedule) and repr(self) == repr(other)
+
+    def __hash__(self):
+        return hash(repr(self))
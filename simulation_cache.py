@@ -0,0 +1,156 @@
+## This module contains a persistent (on-disk) cache for DegradationModel.simulate results.
+##
+## Usage:
+##     cache = SimulationCache("sim_cache", max_size_mb=2000)
+##     sol = model.simulate(T_celsius=40, DOC_ppm=5, t_end_years=0.3, cache=cache)
+##     print(cache.stats())
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+from schedules import Schedule
+
+# Bump when a change of the model equations or of the key contents invalidates previously stored results
+CACHE_VERSION = 3
+
+
+class UncacheableError(TypeError):
+    """A key input has no stable representation (lambda, plain function, arbitrary object)."""
+
+
+def _json_default(obj):
+    """
+    Serialize numpy scalars/arrays and schedules for hashing. Other objects (functions,
+    callable reducers...) would only be identified by their memory address, which changes
+    between sessions and can be reused: they raise UncacheableError.
+    """
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, Schedule):
+        return repr(obj)
+    raise UncacheableError(f"{type(obj).__name__} object {obj!r} has no stable representation for a cache key "
+                           f"(use numbers, strings, arrays or schedules.Schedule)")
+
+
+class SimulationCache:
+    """
+    Content-addressed cache of simulation results stored as pickle files in a directory.
+
+    The key is a SHA-256 hash of the model fingerprint (coefficients, grid, mode...)
+    and of the simulate() arguments, so only the runs whose inputs changed are recomputed.
+    The total size is bounded: least recently used entries are evicted first
+    (file modification time is refreshed on every hit).
+    """
+
+    def __init__(self, directory="sim_cache", max_size_mb=1024.0):
+        """
+        Args:
+            directory (str): Cache directory (created if missing).
+            max_size_mb (float): Maximum total size of the stored results (MB).
+        """
+        self.directory = directory
+        self.max_size_bytes = int(max_size_mb * 1024**2)
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model_fingerprint, run_args):
+        """
+        Hash of everything that affects a simulation result.
+
+        Args:
+            model_fingerprint (dict): DegradationModel.parameter_fingerprint().
+            run_args (dict): Arguments of simulate() (conditions, multipliers, solver settings).
+
+        Returns:
+            str: Hexadecimal SHA-256 digest.
+
+        Raises:
+            UncacheableError: If an input has no stable representation (see _json_default).
+        """
+        payload = json.dumps({'version': CACHE_VERSION, 'model': model_fingerprint, 'run': run_args},
+                             sort_keys=True, default=_json_default)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key):
+        """Return the cached result for key, or None (counts a hit or a miss)."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        os.utime(path) # Mark as recently used
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        """Store a result (atomic write), then evict old entries if the size limit is exceeded."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _entries(self):
+        """(mtime, size, path) of all stored results."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError: # Removed by another process
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all stored results."""
+        for _, _, path in self._entries():
+            os.remove(path)
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries and size_mb of the cache.
+        """
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits, 'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions, 'entries': len(entries),
+            'size_mb': sum(size for _, size, _ in entries) / 1024**2,
+        }
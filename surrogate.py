@@ -0,0 +1,347 @@
+## This module contains a precomputed surrogate (lookup table) of DegradationModel for instant
+## OIT, surface [CO] and lifetime queries over (T, DOC_ppm, L, AH0_mult, t).
+##
+## The table is a tensor grid of full simulations (run in parallel processes, with the on-disk cache)
+## interpolated multilinearly in transformed coordinates (1/T, log(1 + DOC), L, AH0_mult) and time.
+## A run failing late (e.g. long after end of life at high DOC) keeps its outputs up to the failure.
+## The interpolation error is estimated from the curvature of the table along each axis, and refine()
+## inserts grid planes where that estimate is the largest.
+##
+## Usage:
+##     surrogate = Surrogate({'T_celsius': [10, 20, 30, 40], 'DOC_ppm': [0, 0.5, 1, 2, 4],
+##                            'L': [2.3e-3, 4.5e-3, 9e-3], 'AH0_mult': [0.5, 1.0]}, t_max_years=50)
+##     surrogate.build(n_workers=8)
+##     surrogate.refine(n_refinements=4)
+##     oit, err = surrogate.predict('oit_avg', T_celsius=T, DOC_ppm=D, L=4.5e-3, AH0_mult=1.0,
+##                                  t_years=10, return_error=True)
+##     life = surrogate.lifetime(T_celsius=T, DOC_ppm=D, L=4.5e-3, AH0_mult=1.0)
+##     surrogate.save("surrogate.npz");  surrogate = Surrogate.load("surrogate.npz")
+
+import contextlib
+import io
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import RegularGridInterpolator
+
+from degradation_model import DegradationModel, lifetime_years
+from simulation_cache import SimulationCache
+
+AXES = ('T_celsius', 'DOC_ppm', 'L', 'AH0_mult')
+OUTPUTS = ('oit_avg', 'co_surface', 'mw_proxy')
+
+# Interpolation coordinates of the axes: Arrhenius-like in T, logarithmic in DOC (0 ppm allowed)
+TRANSFORMS = {
+    'T_celsius': lambda T: -1000.0 / (np.asarray(T, dtype=float) + 273.15),
+    'DOC_ppm': lambda DOC: np.log1p(np.asarray(DOC, dtype=float)),
+    'L': lambda L: np.asarray(L, dtype=float),
+    'AH0_mult': lambda AH0_mult: np.asarray(AH0_mult, dtype=float),
+}
+INVERSE_TRANSFORMS = {
+    'T_celsius': lambda x: -1000.0 / x - 273.15,
+    'DOC_ppm': np.expm1,
+    'L': lambda x: x,
+    'AH0_mult': lambda x: x,
+}
+
+
+def _run_node(parameters, t_max_years, n_times, model_args, model_attributes, simulate_kwargs, cache_dir):
+    """
+    One table run (in a worker process): OUTPUTS at n_times uniform times, NaN after a solver failure.
+
+    Returns:
+        tuple: ({output: series}, success, message).
+    """
+    series = {name: np.full(n_times, np.nan) for name in OUTPUTS}
+    run_args = {'fallback': True, 'jacobian': 'analytic'}
+    run_args.update(simulate_kwargs)
+    if cache_dir is not None:
+        run_args['cache'] = SimulationCache(cache_dir)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = DegradationModel(L=parameters['L'], **model_args)
+            for name, value in model_attributes.items():
+                setattr(model, name, value)
+            sol = model.simulate(parameters['T_celsius'], parameters['DOC_ppm'], t_max_years, n_timepoints=n_times,
+                                 AH0_mult=parameters['AH0_mult'], reducers=OUTPUTS, keep_state=False, **run_args)
+    except Exception as e:
+        return series, False, f"{type(e).__name__}: {e}"
+    for name in OUTPUTS: # Outputs of the segments completed before a failure are kept
+        series[name][:len(sol.t)] = sol.observables[name]
+    return series, bool(sol.success), str(sol.message)
+
+
+class Surrogate:
+    """
+    Interpolation table of the observables oit_avg, co_surface and mw_proxy (see DegradationModel.observe).
+    """
+
+    def __init__(self, axes, t_max_years, n_times=201, model_args=None, model_attributes=None,
+                 simulate_kwargs=None, cache_dir="sim_cache"):
+        """
+        Args:
+            axes (dict): Node values of each of AXES, e.g. {'T_celsius': [10, 20, 30], ...}
+                         (a scalar fixes the axis; at least 3 nodes are needed to estimate its error).
+            t_max_years (float): Time horizon of the runs (years).
+            n_times (int): Number of (uniform) output times per run.
+            model_args (dict or None): Other DegradationModel arguments (nz, simulation_mode, mesh...).
+            model_attributes (dict or None): Model attributes set after construction (e.g. ti0_oit).
+            simulate_kwargs (dict or None): simulate() arguments (default: fallback=True, jacobian='analytic').
+            cache_dir (str or None): SimulationCache directory of the runs.
+        """
+        missing = [name for name in AXES if name not in axes]
+        if missing:
+            raise ValueError(f"Missing axes: {missing}")
+        self.axes = {name: np.unique(np.atleast_1d(np.asarray(axes[name], dtype=float))) for name in AXES}
+        self.t_max_years = t_max_years
+        self.times_years = np.linspace(0.0, t_max_years, n_times)
+        self.model_args = dict(model_args or {'nz': 50, 'simulation_mode': 'pipe'})
+        self.model_attributes = dict(model_attributes or {})
+        self.simulate_kwargs = dict(simulate_kwargs or {})
+        self.cache_dir = cache_dir
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = DegradationModel(**self.model_args)
+        self.MF_crit = self.model_attributes.get('MF_crit', model.MF_crit) # End-of-life Mw (kg/mol)
+        self.runs = {} # {node values (tuple): {output: series over times_years}}
+        self.history = []
+        self._interpolators = {}
+
+    def _nodes(self):
+        return list(itertools.product(*(self.axes[name] for name in AXES)))
+
+    def _run_nodes(self, nodes, n_workers=None):
+        """Simulate parameter tuples (ordered as AXES) over a process pool; list of _run_node results."""
+        n_workers = n_workers or os.cpu_count() or 1
+        parameters = [dict(zip(AXES, map(float, node))) for node in nodes]
+        settings = (self.t_max_years, len(self.times_years), self.model_args, self.model_attributes,
+                    self.simulate_kwargs, self.cache_dir)
+        if n_workers == 1:
+            return [_run_node(p, *settings) for p in parameters]
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            return list(pool.map(_run_node, parameters, *[itertools.repeat(value) for value in settings]))
+
+    def build(self, n_workers=None, verbose=True):
+        """
+        Simulate the grid nodes that are not in the table yet.
+
+        Returns:
+            pandas.DataFrame: One row per new run: parameters, success, message and the time (years)
+                              up to which its outputs are available.
+        """
+        todo = [node for node in self._nodes() if node not in self.runs]
+        if not todo:
+            return pd.DataFrame()
+        start = time.time()
+        rows = []
+        for node, (series, success, message) in zip(todo, self._run_nodes(todo, n_workers)):
+            self.runs[node] = series
+            valid = np.isfinite(series['oit_avg'])
+            rows.append(dict(zip(AXES, node), success=success, message=message,
+                             t_valid_years=self.times_years[valid][-1] if valid.any() else np.nan))
+        self._interpolators = {}
+        table = pd.DataFrame(rows)
+        if verbose:
+            n_failed = int((~table['success']).sum())
+            print(f"Surrogate: {len(todo)} runs in {time.time() - start:.1f} s"
+                  f"{f', {n_failed} failed (outputs kept up to the failure)' if n_failed else ''}; grid {self.shape}")
+        return table
+
+    @property
+    def shape(self):
+        return tuple(len(self.axes[name]) for name in AXES) + (len(self.times_years),)
+
+    def values(self, output):
+        """Table of an output, shape (n_T, n_DOC, n_L, n_AH0, n_times)."""
+        return np.array([self.runs[node][output] for node in self._nodes()]).reshape(self.shape)
+
+    def _interpolator(self, output):
+        if output not in self._interpolators:
+            # Fixed axes (a single node) are left out of the interpolation
+            coords = [TRANSFORMS[name](self.axes[name]) for name in AXES if len(self.axes[name]) > 1]
+            values = self.values(output).reshape([n for n in self.shape[:-1] if n > 1] + [len(self.times_years)])
+            self._interpolators[output] = RegularGridInterpolator(coords + [self.times_years], values,
+                                                                  bounds_error=False, fill_value=np.nan)
+        return self._interpolators[output]
+
+    def _points(self, T_celsius, DOC_ppm, L, AH0_mult, t_years=None):
+        """Broadcast query arrays and interpolation coordinates (n_points, n_dims)."""
+        query = {'T_celsius': T_celsius, 'DOC_ppm': DOC_ppm, 'L': L, 'AH0_mult': AH0_mult}
+        arrays = np.broadcast_arrays(*[np.asarray(query[name], dtype=float) for name in AXES],
+                                     *([np.asarray(t_years, dtype=float)] if t_years is not None else []))
+        shape = arrays[0].shape
+        columns = []
+        for name, values in zip(AXES, arrays):
+            if len(self.axes[name]) > 1:
+                columns.append(TRANSFORMS[name](values.ravel()))
+            elif np.any(~np.isclose(values, self.axes[name][0])):
+                raise ValueError(f"{name} is fixed to {self.axes[name][0]} in this surrogate")
+        if t_years is not None:
+            columns.append(arrays[-1].ravel())
+        return np.column_stack(columns) if columns else np.empty((arrays[0].size, 0)), shape, arrays
+
+    def predict(self, output, T_celsius, DOC_ppm, L, AH0_mult, t_years, return_error=False):
+        """
+        Interpolated observable, vectorized: the arguments are broadcast against each other.
+
+        Args:
+            output (str): 'oit_avg' (min), 'co_surface' (mol/L) or 'mw_proxy' (kg/mol).
+            T_celsius, DOC_ppm, L, AH0_mult, t_years (float or array-like): Query points
+                (NaN outside the table range).
+            return_error (bool): Also return the estimated interpolation error (see error_estimate).
+
+        Returns:
+            numpy.ndarray (or tuple of two): Values (and error estimates) with the broadcast shape.
+        """
+        points, shape, arrays = self._points(T_celsius, DOC_ppm, L, AH0_mult, t_years)
+        values = self._interpolator(output)(points).reshape(shape)
+        if not return_error:
+            return values
+        error = np.zeros(len(points))
+        for name, axis_error in self._interval_errors(output).items():
+            nodes = self.axes[name] if name != 't_years' else self.times_years
+            query = arrays[AXES.index(name)] if name != 't_years' else arrays[-1]
+            interval = np.clip(np.searchsorted(nodes, query.ravel(), side='right') - 1, 0, len(nodes) - 2)
+            error += axis_error[interval]
+        return values, error.reshape(shape)
+
+    def lifetime(self, T_celsius, DOC_ppm, L, AH0_mult):
+        """
+        Lifetime (years) at which the interpolated Mw at the critical depth reaches MF_crit
+        (see degradation_model.lifetime_years); inf beyond t_max_years, vectorized.
+        """
+        points, shape, _ = self._points(T_celsius, DOC_ppm, L, AH0_mult)
+        n_t = len(self.times_years)
+        full = np.column_stack([np.repeat(points, n_t, axis=0), np.tile(self.times_years, len(points))])
+        mw = self._interpolator('mw_proxy')(full).reshape((len(points), n_t))
+        life = lifetime_years(self.times_years, mw, self.MF_crit)
+        # Unknown if MF_crit is not reached before missing values (outside the table, failed runs)
+        life = np.where(np.isinf(life) & np.isnan(mw).any(axis=1), np.nan, life)
+        return life.reshape(shape)
+
+    def _interval_errors(self, output):
+        """
+        Estimated error of linear interpolation on each interval of each axis: h**2 / 8 * |f''|,
+        the second derivative being estimated from the table (maximum over all the other axes).
+        Axes with fewer than 3 nodes have no estimate (assumed linear).
+        """
+        values = self.values(output)
+        errors = {}
+        for axis, name in enumerate(AXES + ('t_years',)):
+            nodes = self.times_years if name == 't_years' else self.axes[name]
+            if len(nodes) < 3:
+                continue
+            x = nodes if name == 't_years' else TRANSFORMS[name](nodes)
+            f = np.moveaxis(values, axis, 0)
+            slope = np.diff(f, axis=0) / np.diff(x).reshape((-1,) + (1,) * (f.ndim - 1))
+            curvature = np.abs(np.diff(slope, axis=0)) / ((x[2:] - x[:-2]) / 2).reshape((-1,) + (1,) * (f.ndim - 1))
+            curvature = np.nanmax(curvature.reshape((len(x) - 2, -1)), axis=1) # Interior nodes
+            node_curvature = np.concatenate(([curvature[0]], curvature, [curvature[-1]]))
+            h = np.diff(x)
+            errors[name] = h**2 / 8 * np.maximum(node_curvature[:-1], node_curvature[1:])
+        return errors
+
+    def error_estimate(self, output='oit_avg'):
+        """
+        Estimated interpolation error per interval of each axis.
+
+        Returns:
+            pandas.DataFrame: axis, lower, upper, estimated_error; largest errors first.
+        """
+        rows = []
+        for name, axis_error in self._interval_errors(output).items():
+            nodes = self.times_years if name == 't_years' else self.axes[name]
+            rows += [{'axis': name, 'lower': nodes[i], 'upper': nodes[i + 1], 'estimated_error': e}
+                     for i, e in enumerate(axis_error)]
+        return pd.DataFrame(rows).sort_values('estimated_error', ascending=False, ignore_index=True)
+
+    def refine(self, output='oit_avg', n_refinements=1, n_workers=None, verbose=True):
+        """
+        Insert a grid plane in the middle (in interpolation coordinates) of the parameter interval
+        with the largest estimated error, simulate it, and repeat. The error measured on the new
+        runs (prediction before refinement vs simulation) is recorded in self.history.
+        The time axis is not refined (every run already has n_times output times).
+
+        Returns:
+            pandas.DataFrame: self.history.
+        """
+        for _ in range(n_refinements):
+            estimate = self.error_estimate(output)
+            estimate = estimate[estimate['axis'] != 't_years']
+            if estimate.empty:
+                raise ValueError("No parameter axis with at least 3 nodes to estimate the error")
+            worst = estimate.iloc[0]
+            name = worst['axis']
+            x_lower, x_upper = TRANSFORMS[name](worst['lower']), TRANSFORMS[name](worst['upper'])
+            value = float(INVERSE_TRANSFORMS[name]((x_lower + x_upper) / 2))
+
+            refined_axes = dict(self.axes, **{name: np.unique(np.append(self.axes[name], value))})
+            new_nodes = [node for node in itertools.product(*(refined_axes[axis] for axis in AXES))
+                         if node not in self.runs]
+            # Prediction of the current table at the new nodes, before they are simulated
+            predicted = np.array([self.predict(output, *node, t_years=self.times_years) for node in new_nodes])
+            self.axes = refined_axes
+            self.build(n_workers=n_workers, verbose=False)
+            simulated = np.array([self.runs[node][output] for node in new_nodes])
+            measured = float(np.nanmax(np.abs(predicted - simulated))) if np.isfinite(simulated).any() else np.nan
+            self.history.append({'axis': name, 'value': value, 'estimated_error': worst['estimated_error'],
+                                 'measured_error': measured, 'n_runs': len(new_nodes), 'shape': self.shape})
+            if verbose:
+                print(f"Refined {name} at {value:.4g}: estimated error {worst['estimated_error']:.3g}, "
+                      f"measured {measured:.3g} ({len(new_nodes)} runs, grid {self.shape})")
+        return pd.DataFrame(self.history)
+
+    def validate(self, n_points=20, seed=0, n_workers=None):
+        """
+        Compare the surrogate with direct simulations at random points of the parameter box.
+
+        Returns:
+            pandas.DataFrame: One row per point and output time: parameters, t_years, and for each
+                              output the simulated value, the prediction and the estimated error.
+        """
+        rng = np.random.default_rng(seed)
+        samples = {}
+        for name in AXES:
+            lower, upper = TRANSFORMS[name](self.axes[name][[0, -1]])
+            samples[name] = INVERSE_TRANSFORMS[name](rng.uniform(lower, upper, n_points))
+        nodes = [tuple(samples[name][i] for name in AXES) for i in range(n_points)]
+        rows = []
+        for query, (result, _, _) in zip(nodes, self._run_nodes(nodes, n_workers)):
+            block = pd.DataFrame(dict(zip(AXES, query)), index=range(len(self.times_years)))
+            block['t_years'] = self.times_years
+            for output in OUTPUTS:
+                block[output] = result[output]
+                block[f'{output}_predicted'], block[f'{output}_estimated_error'] = \
+                    self.predict(output, *query, t_years=self.times_years, return_error=True)
+            rows.append(block)
+        return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+
+    def save(self, path):
+        """Write the table to a .npz file (runs, axes and settings)."""
+        settings = {'t_max_years': self.t_max_years, 'model_args': self.model_args,
+                    'model_attributes': self.model_attributes, 'simulate_kwargs': self.simulate_kwargs,
+                    'cache_dir': self.cache_dir, 'MF_crit': self.MF_crit, 'history': self.history}
+        np.savez(path, times_years=self.times_years, settings=json.dumps(settings, default=repr),
+                 **{f'axis_{name}': self.axes[name] for name in AXES},
+                 **{f'values_{output}': self.values(output) for output in OUTPUTS})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            settings = json.loads(str(data['settings']))
+            axes = {name: data[f'axis_{name}'] for name in AXES}
+            surrogate = cls(axes, settings['t_max_years'], model_args=settings['model_args'],
+                            model_attributes=settings['model_attributes'],
+                            simulate_kwargs=settings['simulate_kwargs'], cache_dir=settings['cache_dir'])
+            surrogate.times_years = data['times_years']
+            values = {output: data[f'values_{output}'] for output in OUTPUTS}
+        surrogate.MF_crit = settings['MF_crit']
+        surrogate.history = settings['history']
+        for i, node in enumerate(surrogate._nodes()):
+            index = np.unravel_index(i, surrogate.shape[:-1])
+            surrogate.runs[node] = {output: values[output][index] for output in OUTPUTS}
+        return surrogate